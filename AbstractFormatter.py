@@ -1,8 +1,80 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+
+# Знаков после запятой: больше не имеет смысла для денег, а каждое значение - отдельный
+# набор шаблонов в кэше, поэтому диапазон ограничен и кэш не растёт от произвольного ввода.
+MAX_DECIMAL_PLACES = 10
+
 
 class AbstractCurrencyFormatter(ABC):
-    @staticmethod
-    @abstractmethod
-    def format(amount, currency):
-        pass
+    # Шаблон результата: {value} - сумма, {currency} - код валюты.
+    PATTERN = "{value} {currency}"
+
+    @classmethod
+    def format(cls, amount, currency, decimal_places=2):
+        """
+        Форматирует результат конвертации по PATTERN класса.
+        Быстрый путь читает кэш шаблонов самого класса (как template), а не унаследованный:
+        подкласс со своим PATTERN не получит текст родителя.
+        """
+        try:
+            return cls.__dict__["_compiled"][decimal_places][currency](amount)
+        except KeyError:
+            return cls.template(decimal_places, currency)(amount)
+
+    @classmethod
+    def template(cls, decimal_places, currency, newline=False):
+        """
+        Скомпилированный шаблон для пары (знаки после запятой, валюта).
+        Шаблон собирается один раз и кэшируется.
+        :return: Функция, форматирующая одну сумму.
+        :raises ValueError: decimal_places не целое от 0 до MAX_DECIMAL_PLACES.
+        """
+        # Кэш у каждого класса свой: {знаков после запятой: {валюта: str.format}}.
+        name = "_compiled_lines" if newline else "_compiled"
+        compiled = cls.__dict__.get(name)
+        if compiled is None:
+            compiled = {}
+            setattr(cls, name, compiled)
+        by_currency = compiled.get(decimal_places)
+        if by_currency is None:
+            if not isinstance(decimal_places, int) or not 0 <= decimal_places <= MAX_DECIMAL_PLACES:
+                raise ValueError(f"Знаков после запятой должно быть от 0 до {MAX_DECIMAL_PLACES}, "
+                                 f"а не {decimal_places!r}")
+            by_currency = compiled[decimal_places] = {}
+        template = by_currency.get(currency)
+        if template is None:
+            text = cls.PATTERN.replace("{currency}", str(currency).replace("{", "{{").replace("}", "}}"))
+            text = text.replace("{value}", "{:.%df}" % decimal_places)
+            template = by_currency[currency] = (text + "\n" if newline else text).format
+        return template
+
+    @classmethod
+    def format_many(cls, amounts, currency, decimal_places=2, out=None):
+        """
+        Форматирует массив сумм.
+        :amounts: Суммы (list, tuple или numpy.ndarray).
+        :currency: Код валюты или последовательность кодов (по одному на сумму).
+        :decimal_places: Количество знаков после запятой.
+        :out: Куда писать: None - вернуть новый список; list - дописать в него;
+              файлоподобный объект - записать по строке на сумму.
+        :return: Список строк или out.
+        """
+        if hasattr(amounts, "tolist"):
+            amounts = amounts.tolist()  # float Python форматируется быстрее numpy.float64
+        writes_file = out is not None and hasattr(out, "write")
+
+        if isinstance(currency, str):
+            lines = map(cls.template(decimal_places, currency, writes_file), amounts)
+        else:
+            if hasattr(currency, "tolist"):
+                currency = currency.tolist()
+            template = cls.template
+            lines = (template(decimal_places, c, writes_file)(a) for a, c in zip(amounts, currency))
 
+        if out is None:
+            return list(lines)
+        if writes_file:
+            out.writelines(lines)
+        else:
+            out.extend(lines)
+        return out
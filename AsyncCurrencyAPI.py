@@ -0,0 +1,196 @@
+import asyncio
+import time
+
+from CurrencyErrors import CircuitOpen, DeadlineExceeded, ProviderError, QuotaExhausted
+from Deadline import Deadline
+from LazyImport import LazyModule
+from Metrics import SIZE_BUCKETS, metrics
+from RatePayload import accept_encoding, decompress, parse_snapshot
+
+# aiohttp нужен только для сетевого запроса: тёплый старт из SQLiteRateStore его не импортирует.
+aiohttp = LazyModule("aiohttp")
+
+
+class AsyncCurrencyAPI:
+    def __init__(self, api_url, pool_size=10, connect_timeout=5.0, read_timeout=10.0, conditional_get=True,
+                 limiter=None, request_timeout=30.0, breaker=None, compression=True):
+        """
+        Асинхронный клиент API курсов с пулом соединений.
+        :api_url: URL таблицы курсов.
+        :pool_size: Максимальное число одновременных соединений в пуле.
+        :connect_timeout: Таймаут установки соединения в секундах.
+        :read_timeout: Таймаут чтения ответа в секундах.
+        :conditional_get: Отправлять If-None-Match / If-Modified-Since при обновлении.
+        :limiter: Необязательный QuotaLimiter: запросы сверх его квоты не отправляются (QuotaExhausted).
+        :request_timeout: Предельное время всего запроса в секундах (None - без предела);
+                          срок вызова (deadline) может только сократить его.
+        :breaker: Необязательный CircuitBreaker: после серии сбоев запросы не отправляются (CircuitOpen).
+        :compression: Запрашивать сжатый ответ (gzip / deflate, br - если установлен brotli).
+        """
+        self.api_url = api_url
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.conditional_get = conditional_get
+        self.limiter = limiter
+        self.request_timeout = request_timeout
+        self.breaker = breaker
+        self.compression = compression
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "rejected": 0,
+            "errors": 0,
+            "not_modified": 0,
+            "bytes_received": 0,  # по сети, до распаковки
+            "bytes_decoded": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+        }
+        self._session = None
+        self._etag = None
+        self._last_modified = None
+        self._last_snapshot = None
+
+    def _get_session(self):
+        # Сессия создаётся лениво, внутри того цикла событий, где её используют.
+        if self._session is None or self._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_created)
+            trace.on_connection_reuseconn.append(self._on_connection_reused)
+            # Ответ распаковывается в _request (auto_decompress=False): так известен размер по сети,
+            # а Accept-Encoding перечисляет ровно те сжатия, которые умеет RatePayload.decompress.
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout),
+                headers={"Accept-Encoding": accept_encoding() if self.compression else "identity"},
+                auto_decompress=False,
+                trace_configs=[trace])
+        return self._session
+
+    @property
+    def last_snapshot(self):
+        """
+        Последняя полученная таблица (None, если запросов ещё не было).
+        """
+        return self._last_snapshot
+
+    async def _on_connection_created(self, session, context, params):
+        self.stats["connections_created"] += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self.stats["connections_reused"] += 1
+
+    def _conditional_headers(self):
+        headers = {}
+        if self.conditional_get and self._last_snapshot is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    async def get_snapshot(self, deadline=None):
+        """
+        Загружает всю таблицу курсов одним запросом.
+        Если сервер ответил 304, продлевает предыдущий снимок без повторной загрузки.
+        :deadline: Срок вызова (Deadline или секунды): запрос ограничен оставшимся временем.
+        :return: RateSnapshot.
+        :raises ProviderError: Ошибка соединения, HTTP-статус ошибки или некорректная таблица.
+        :raises DeadlineExceeded: Срок вызова или request_timeout истёк до получения ответа.
+        :raises CircuitOpen: Предохранитель разомкнут; в сеть ничего не отправлено.
+        :raises QuotaExhausted: Ограничитель не разрешил запрос; в сеть ничего не отправлено.
+        """
+        deadline = Deadline.of(deadline)
+        if deadline is not None:
+            deadline.check()
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            self.stats["rejected"] += 1
+            raise CircuitOpen(breaker.retry_after(), self.api_url)
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self.stats["throttled"] += 1
+            if breaker is not None:
+                breaker.release()
+            raise QuotaExhausted(self.limiter.retry_after())
+        timeout = self.request_timeout if deadline is None else deadline.limit(self.request_timeout)
+        # Запрос ограничен сроком вызывающего, а не собственным request_timeout поставщика.
+        caller_limited = timeout is not None and timeout != self.request_timeout
+        try:
+            snapshot = await self._request(timeout)
+        except ProviderError:
+            self.stats["errors"] += 1
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except DeadlineExceeded:
+            self.stats["errors"] += 1
+            if breaker is not None:
+                if caller_limited and deadline.expired:
+                    breaker.release()  # истёк бюджет вызывающего - это не сбой поставщика
+                else:
+                    breaker.record_failure()
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release()  # отмена (например, проигравший дублирующий запрос пула) - не сбой
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return snapshot
+
+    async def _request(self, timeout):
+        start = time.perf_counter() if metrics.enabled else None
+        request_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout,
+                                                sock_read=self.read_timeout)
+        try:
+            async with self._get_session().get(self.api_url, headers=self._conditional_headers(),
+                                               timeout=request_timeout) as response:
+                body = await response.read()
+        except Exception as e:
+            if start is not None:
+                metrics.inc("currency_api_errors_total", error=type(e).__name__)
+            # TimeoutError проверяется первым: он же OSError, а ServerTimeoutError - ещё и ClientError.
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded(f"{self.api_url}: поставщик не ответил вовремя") from e
+            if isinstance(e, (aiohttp.ClientError, OSError)):
+                raise ProviderError(self.api_url, message=f"{self.api_url}: {type(e).__name__}: {e}") from e
+            raise
+        self.stats["requests"] += 1
+        self.stats["bytes_received"] += len(body)
+        if start is not None:
+            metrics.observe("currency_api_fetch_seconds", time.perf_counter() - start)
+            metrics.inc("currency_api_responses_total", status=response.status)
+            metrics.observe("currency_api_payload_bytes", len(body), buckets=SIZE_BUCKETS)
+
+        if response.status == 304 and self._last_snapshot is not None:
+            self.stats["not_modified"] += 1
+            self._last_snapshot = self._last_snapshot.renewed()
+            return self._last_snapshot
+        if response.status != 200:
+            raise ProviderError(self.api_url, response.status)
+        decode_start = time.perf_counter() if start is not None else None
+        try:
+            body = decompress(body, response.headers.get("Content-Encoding"))
+            snapshot = parse_snapshot(body)
+        except ValueError as e:
+            raise ProviderError(self.api_url, 200, f"{self.api_url}: некорректная таблица курсов ({e})") from e
+        self.stats["bytes_decoded"] += len(body)
+        if decode_start is not None:
+            metrics.observe("currency_api_decode_seconds", time.perf_counter() - decode_start)
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+        self._last_snapshot = snapshot
+        return snapshot
+
+    async def get_exchange_rate(self, from_currency, to_currency, deadline=None):
+        snapshot = await self.get_snapshot(deadline)
+        return snapshot.get_rate(from_currency, to_currency)
+
+    async def close(self):
+        """
+        Закрывает пул соединений.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,264 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from ConverterLogging import logger
+from CurrencyErrors import CircuitOpen, QuotaExhausted, RateUnavailable
+from Deadline import Deadline
+from Metrics import metrics
+from TTLCache import TTLCache
+
+
+class AsyncCurrencyCache:
+    def __init__(self, store=None, maxsize=128, refresh_policy=None, history=None, loop=None):
+        """
+        Асинхронный кэш таблиц курсов.
+        :store: Необязательное постоянное хранилище (например, SQLiteRateStore).
+        :maxsize: Максимальное число таблиц (по одной на URL API) в памяти.
+        :refresh_policy: Необязательный RefreshPolicy: включает фоновое обновление
+                         (stale-while-revalidate) до истечения жёсткого срока.
+        :history: Необязательный HistoricalRateStore: каждая загруженная таблица дописывается в историю.
+        :loop: Функция, возвращающая цикл событий фоновых обновлений (например, AsyncRunner.get_loop).
+               По умолчанию - цикл, в котором впервые вызван get_snapshot; до этого вызова
+               таблица, загруженная из store, не обновляется в фоне.
+        """
+        self.cache = TTLCache(maxsize=maxsize, ttl=3600.0)  # api_url -> RateSnapshot, кэш актуален 1 час
+        self.store = store
+        self.refresh_policy = refresh_policy
+        self.history = history
+        if refresh_policy is not None:
+            self.cache.ttl = refresh_policy.hard_ttl
+        self._inflight = {}  # api_url -> задача загрузки, общая для всех ожидающих
+        self._refresh_at = {}  # api_url -> момент (по часам кэша) фонового обновления
+        self._timers = {}  # api_url -> запланированное фоновое обновление
+        self._attempts = {}  # api_url -> число неудачных фоновых обновлений подряд
+        self._loop = None
+        self._loop_source = loop
+        self._history_writer = None  # один поток: строки истории дописываются по порядку загрузок
+
+    @property
+    def cache_duration(self):
+        return timedelta(seconds=self.cache.ttl)
+
+    @cache_duration.setter
+    def cache_duration(self, value):
+        self.cache.ttl = value.total_seconds()
+
+    def lookup(self, api):
+        """
+        Возвращает актуальную таблицу из кэша без обращения к API.
+        Если таблица старше мягкого срока, запускает её фоновое обновление
+        и всё равно возвращает текущую.
+        :api: Объект API, по URL которого хранится таблица.
+        :return: RateSnapshot или None, если таблицы нет или она устарела.
+        """
+        snapshot = self._lookup(api)
+        if metrics.enabled:
+            metrics.inc("currency_cache_requests_total", result="miss" if snapshot is None else "hit")
+        return snapshot
+
+    def _lookup(self, api):
+        snapshot = self.cache.get(api.api_url)
+        if snapshot is not None:
+            if (self.refresh_policy is not None and api.api_url not in self._inflight
+                    and self.cache.clock() >= self._refresh_at.get(api.api_url, 0.0)):
+                self._call_in_loop(self._start_refresh, api)
+            return snapshot
+        if self.store is not None:
+            # Таблица могла быть сохранена прошлым запуском или другим процессом.
+            snapshot = self.store.load(api.api_url)
+            if snapshot is not None and snapshot.is_fresh(self.cache_duration):
+                self._remember(api, snapshot, (datetime.now() - snapshot.timestamp).total_seconds())
+                return snapshot
+        return None
+
+    async def get_snapshot(self, api, deadline=None):
+        """
+        Получает таблицу курсов из кэша или API.
+        Одновременные промахи по одному API объединяются в одну загрузку:
+        все вызывающие ждут её результат или получают её исключение.
+        Если квота запросов исчерпана или предохранитель API разомкнут, отдаётся
+        последняя известная таблица, даже устаревшая.
+        :api: Объект AsyncCurrencyAPI для запроса таблицы, если её нет в кэше.
+        :deadline: Срок вызова (Deadline или секунды). Ограничивает ожидание этого вызывающего;
+                   общая загрузка продолжается (в пределах request_timeout API) и пополнит кэш.
+        :return: RateSnapshot или None, если API вернул пустой ответ.
+        :raises RateUnavailable: Таблицы нет ни в кэше, ни у API (ProviderError, DeadlineExceeded, ...).
+        """
+        self._loop = asyncio.get_running_loop()
+        snapshot = self.lookup(api)
+        if snapshot is not None:
+            return snapshot
+        return await self.fetch_snapshot(api, deadline)
+
+    async def fetch_snapshot(self, api, deadline=None):
+        """
+        Вторая половина get_snapshot: загрузка после промаха, уже учтённого вызовом lookup.
+        Поиск в кэше не повторяется (и не учитывается в статистике второй раз); отдаётся лишь
+        таблица, загруженная другим вызывающим между lookup и этим вызовом.
+        :api: Объект AsyncCurrencyAPI.
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: RateSnapshot или None, если API вернул пустой ответ.
+        :raises RateUnavailable: Таблицы нет ни в кэше, ни у API.
+        """
+        self._loop = asyncio.get_running_loop()
+        snapshot = self.cache.peek(api.api_url)
+        if snapshot is not None:
+            return snapshot
+        deadline = Deadline.of(deadline)
+        try:
+            # shield: отмена одного ожидающего (или истечение его срока) не отменяет загрузку для остальных
+            if deadline is None:
+                return await asyncio.shield(self._start_fetch(api))
+            deadline.check()
+            return await deadline.wait(asyncio.shield(self._start_fetch(api)))
+        except (QuotaExhausted, CircuitOpen) as e:
+            snapshot = self._fallback(api, e)
+            if snapshot is None:
+                raise
+            return snapshot
+
+    def _fallback(self, api, error):
+        snapshot = getattr(api, "last_snapshot", None)
+        if snapshot is None and self.store is not None:
+            snapshot = self.store.load(api.api_url)
+        if snapshot is None:
+            return None
+        # Устаревшая таблица отдаётся из кэша, пока ограничитель или предохранитель не разрешит следующий запрос.
+        self.cache.set(api.api_url, snapshot, max(error.retry_after, 0.001))
+        self._refresh_at[api.api_url] = self.cache.clock() + error.retry_after
+        if metrics.enabled:
+            reason = "quota" if isinstance(error, QuotaExhausted) else "circuit_open"
+            metrics.inc("currency_cache_fallbacks_total", reason=reason)
+        return snapshot
+
+    def _start_fetch(self, api):
+        task = self._inflight.get(api.api_url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(api))
+            self._inflight[api.api_url] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(api, t))
+        return task
+
+    def _on_fetch_done(self, api, task):
+        self._inflight.pop(api.api_url, None)
+        if not task.cancelled():
+            task.exception()  # все ожидающие могли уйти по сроку: ошибка не считается потерянной
+
+    async def _fetch(self, api):
+        snapshot = await api.get_snapshot()
+        if snapshot is not None:
+            self.update_cache(api, snapshot)
+        return snapshot
+
+    async def get_rate(self, from_currency, to_currency, api, deadline=None):
+        """
+        Получает курс из кэша или API.
+        :from_currency: Исходная валюта.
+        :to_currency: Целевая валюта.
+        :api: Объект AsyncCurrencyAPI для запроса курса, если его нет в кэше.
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: Курс (float) или None, если валюты нет в таблице.
+        :raises RateUnavailable: Таблица курсов недоступна.
+        """
+        snapshot = await self.get_snapshot(api, deadline)
+        if snapshot is None:
+            raise RateUnavailable(f"{api.api_url}: таблица курсов недоступна")
+        return snapshot.get_rate(from_currency, to_currency)
+
+    def update_cache(self, api, snapshot):
+        """
+        Обновляет кэш.
+        :api: Объект API, от которого получена таблица.
+        :snapshot: Снимок таблицы курсов (RateSnapshot).
+        """
+        self._remember(api, snapshot)
+        if self.store is not None:
+            self.store.save(api.api_url, snapshot)
+        if self.history is not None:
+            self._record_history(snapshot)
+
+    def close(self):
+        """
+        Отменяет запланированные фоновые обновления и дожидается записи истории.
+        """
+        for timer in list(self._timers.values()):
+            self._call_in_loop(timer.cancel)
+        self._timers.clear()
+        if self._history_writer is not None:
+            self._history_writer.shutdown(wait=True)
+            self._history_writer = None
+
+    def _record_history(self, snapshot):
+        # Запись в mmap-файл истории блокирует: в цикле событий она уходит в отдельный поток.
+        # Загрузка к этому моменту уже удалась, поэтому ошибка истории её не отменяет.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._append_history(snapshot)
+            return
+        if self._history_writer is None:
+            self._history_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-history")
+        self._history_writer.submit(self._append_history, snapshot)
+
+    def _append_history(self, snapshot):
+        try:
+            self.history.append(snapshot)
+        except Exception:
+            logger.exception("Не удалось дописать таблицу %s в историю курсов", snapshot.base)
+
+    def _remember(self, api, snapshot, age=0.0):
+        self.cache.set(api.api_url, snapshot, self.cache.ttl - age)
+        if self.refresh_policy is not None:
+            delay = max(self.refresh_policy.refresh_delay() - age, 0.0)
+            limiter = getattr(api, "limiter", None)
+            if limiter is not None:
+                # Обновления разносятся по окнам ограничителя; при напряжённой квоте - откладываются.
+                delay = limiter.schedule(delay)
+            self._refresh_at[api.api_url] = self.cache.clock() + delay
+            self._call_in_loop(self._schedule_refresh, api, delay)
+
+    def _call_in_loop(self, callback, *args):
+        # Фоновые задачи живут в цикле кэша; lookup может вызываться и из других потоков.
+        # Цикл из loop берётся при каждом вызове: так таблица из store обновляется в фоне
+        # ещё до первой загрузки, а после fork используется новый цикл AsyncRunner.
+        loop = self._loop if self._loop_source is None else self._loop_source()
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _schedule_refresh(self, api, delay):
+        timer = self._timers.pop(api.api_url, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[api.api_url] = asyncio.get_running_loop().call_later(delay, self._start_refresh, api, True)
+
+    def _start_refresh(self, api, scheduled=False):
+        if api.api_url in self._inflight:
+            return
+        if not scheduled and self.cache.clock() < self._refresh_at.get(api.api_url, 0.0):
+            return  # таблицу уже обновили или повтор ещё не наступил
+        task = self._start_fetch(api)
+        task.add_done_callback(lambda t: self._on_refresh_done(api, t))
+
+    def _on_refresh_done(self, api, task):
+        if not task.cancelled() and task.exception() is None and task.result() is not None:
+            self._attempts.pop(api.api_url, None)
+            return
+        if api.api_url in self.cache:
+            # Повторяем с нарастающей задержкой, пока таблица не истекла окончательно.
+            attempt = self._attempts.get(api.api_url, 0)
+            self._attempts[api.api_url] = attempt + 1
+            delay = self.refresh_policy.retry_delay(attempt)
+            error = None if task.cancelled() else task.exception()
+            if isinstance(error, (QuotaExhausted, CircuitOpen)):
+                delay = max(delay, error.retry_after)
+            self._refresh_at[api.api_url] = self.cache.clock() + delay
+            self._schedule_refresh(api, delay)
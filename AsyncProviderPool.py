@@ -0,0 +1,208 @@
+import asyncio
+import time
+from collections import deque
+
+from AsyncCurrencyAPI import AsyncCurrencyAPI
+from CircuitBreaker import OPEN
+from CurrencyErrors import CircuitOpen, DeadlineExceeded
+from Deadline import Deadline
+from Metrics import metrics
+
+
+class ProviderStats:
+    def __init__(self, api, window=100, alpha=0.2):
+        """
+        Статистика задержек одного поставщика курсов.
+        :api: AsyncCurrencyAPI поставщика.
+        :window: Сколько последних задержек хранить для перцентилей.
+        :alpha: Вес нового замера в скользящем среднем (EWMA).
+        """
+        self.api = api
+        self.alpha = alpha
+        self.latencies = deque(maxlen=window)
+        self.ewma = None  # None - поставщик ещё не опрашивался
+        self.requests = 0
+        self.wins = 0
+        self.errors = 0
+        self.consecutive_errors = 0  # ошибок подряд с последней победы: понижает поставщика в ranked
+        self.cancelled = 0
+
+    def observe(self, latency, censored=False):
+        """
+        Учитывает задержку успешного (или отменённого) запроса. Ошибки сюда не попадают:
+        быстрый отказ иначе выглядел бы самым быстрым ответом.
+        :censored: Запрос отменён, latency - лишь нижняя оценка: влияет на выбор основного
+                   поставщика (EWMA), но не на перцентили, по которым выбирается момент дубля.
+        """
+        if not censored:
+            self.latencies.append(latency)
+        self.ewma = latency if self.ewma is None else self.ewma + self.alpha * (latency - self.ewma)
+
+    def percentile(self, q):
+        """
+        Перцентиль задержки (q от 0 до 1) по последним замерам; None, если замеров нет.
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def circuit_open(self):
+        """
+        Предохранитель поставщика разомкнут: запрос к нему сразу завершится CircuitOpen.
+        """
+        breaker = getattr(self.api, "breaker", None)
+        return breaker is not None and breaker.state == OPEN
+
+    def as_dict(self):
+        return {"api_url": self.api.api_url, "requests": self.requests, "wins": self.wins, "errors": self.errors,
+                "cancelled": self.cancelled, "ewma": self.ewma, "p50": self.percentile(0.5),
+                "p95": self.percentile(0.95), "consecutive_errors": self.consecutive_errors,
+                "circuit_open": self.circuit_open}
+
+
+class AsyncProviderPool:
+    def __init__(self, providers, name=None, hedge_percentile=0.95, min_hedge_delay=0.02, max_hedge_delay=1.0,
+                 max_parallel=2, min_samples=5, **options):
+        """
+        Несколько поставщиков курсов за интерфейсом AsyncCurrencyAPI.
+        Запрос идёт к самому быстрому поставщику (по скользящему среднему задержки); если ответа нет
+        дольше перцентиля hedge_percentile его задержек, тот же запрос дублируется следующему поставщику.
+        Берётся первый корректный ответ, остальные запросы отменяются. Ошибка поставщика
+        (в том числе разомкнутый предохранитель) сразу передаёт запрос следующему.
+        :providers: URL или объекты AsyncCurrencyAPI поставщиков (таблицы с одной базовой валютой).
+        :name: Ключ пула в кэше (по умолчанию - URL поставщиков через "|").
+        :hedge_percentile: Перцентиль задержки основного поставщика, после которого отправляется дубль.
+        :min_hedge_delay: Нижняя граница задержки перед дублем в секундах.
+        :max_hedge_delay: Верхняя граница (и задержка, пока замеров меньше min_samples).
+        :max_parallel: Сколько запросов к разным поставщикам может идти одновременно.
+        :min_samples: Сколько замеров нужно, чтобы доверять перцентилю.
+        :options: Параметры AsyncCurrencyAPI для поставщиков, заданных URL.
+        """
+        apis = [p if isinstance(p, AsyncCurrencyAPI) else AsyncCurrencyAPI(p, **options) for p in providers]
+        if not apis:
+            raise ValueError("Нужен хотя бы один поставщик курсов")
+        self.providers = [ProviderStats(api) for api in apis]
+        self.api_url = name or "|".join(api.api_url for api in apis)
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.max_parallel = max_parallel
+        self.min_samples = min_samples
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+        self._last_snapshot = None
+
+    @property
+    def last_snapshot(self):
+        """
+        Последняя полученная таблица (для отдачи из кэша, пока предохранители поставщиков разомкнуты).
+        """
+        return self._last_snapshot
+
+    def ranked(self):
+        """
+        Поставщики от предпочтительного к запасным: сначала ещё не опрошенные, затем по EWMA задержки.
+        Поставщик с ошибками подряд идёт после безошибочных (пока не выиграет запрос дублем или
+        при переключении), с разомкнутым предохранителем - в конце.
+        """
+        return sorted(self.providers, key=lambda p: (p.circuit_open, p.consecutive_errors, p.ewma is not None,
+                                                     p.ewma or 0.0))
+
+    def hedge_delay(self, provider):
+        """
+        Сколько ждать ответа поставщика, прежде чем дублировать запрос.
+        """
+        if len(provider.latencies) < self.min_samples:
+            return self.max_hedge_delay
+        delay = provider.percentile(self.hedge_percentile)
+        return min(max(delay, self.min_hedge_delay), self.max_hedge_delay)
+
+    async def get_snapshot(self, deadline=None):
+        """
+        Загружает таблицу курсов у самого быстрого ответившего поставщика.
+        :deadline: Срок вызова (Deadline или секунды), общий для основного и дублирующих запросов.
+        :return: RateSnapshot или None, если ни один поставщик не вернул таблицу.
+        :raises RateUnavailable: Последняя ошибка поставщиков, если ни один не ответил.
+        :raises DeadlineExceeded: Срок истёк раньше первого корректного ответа.
+        """
+        deadline = Deadline.of(deadline)
+        if deadline is not None:
+            deadline.check()
+        self.stats["requests"] += 1
+        queue = self.ranked()
+        running = {}  # задача -> (поставщик, момент запуска)
+        hedges = set()  # задачи дублирующих запросов (а не основного или переключения после ошибки)
+        last_error = None
+
+        def launch():
+            provider = queue.pop(0)
+            provider.requests += 1
+            task = asyncio.ensure_future(provider.api.get_snapshot(deadline))
+            running[task] = (provider, time.perf_counter())
+            return provider, task
+
+        primary, _ = launch()
+        try:
+            while running:
+                can_hedge = queue and len(running) < self.max_parallel
+                timeout = self.hedge_delay(primary) if can_hedge else None
+                if deadline is not None:
+                    timeout = deadline.limit(timeout)
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done and deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(f"Срок {deadline.timeout:g} с истёк: ни один поставщик не ответил")
+                if not done:
+                    self.stats["hedged"] += 1
+                    if metrics.enabled:
+                        metrics.inc("currency_provider_hedges_total")
+                    hedges.add(launch()[1])
+                    continue
+                for task in done:
+                    provider, started = running.pop(task)
+                    error = task.exception()
+                    if isinstance(error, CircuitOpen):
+                        last_error = error  # запрос не отправлялся: задержка поставщика не измерена
+                        continue
+                    snapshot = None if error else task.result()
+                    if snapshot is not None and snapshot.rates:
+                        provider.observe(time.perf_counter() - started)
+                        provider.wins += 1
+                        provider.consecutive_errors = 0
+                        if task in hedges:
+                            self.stats["hedge_wins"] += 1
+                        self._last_snapshot = snapshot
+                        return snapshot
+                    provider.errors += 1
+                    provider.consecutive_errors += 1
+                    last_error = error or last_error
+                if queue and len(running) < self.max_parallel and not (deadline is not None and deadline.expired):
+                    self.stats["failovers"] += 1  # ошибка поставщика: не ждём задержки дубля
+                    primary, _ = launch()  # дальше момент дубля отсчитывается по новому поставщику
+        finally:
+            for task, (provider, started) in running.items():
+                task.cancel()
+                provider.cancelled += 1
+                # Нижняя оценка задержки полезна, только если она больше текущей оценки поставщика.
+                elapsed = time.perf_counter() - started
+                if provider.ewma is None or elapsed > provider.ewma:
+                    provider.observe(elapsed, censored=True)
+        if last_error is not None:
+            raise last_error
+        return None
+
+    async def get_exchange_rate(self, from_currency, to_currency, deadline=None):
+        snapshot = await self.get_snapshot(deadline)
+        if snapshot is None:
+            return None
+        return snapshot.get_rate(from_currency, to_currency)
+
+    def provider_stats(self):
+        """
+        Статистика поставщиков в порядке предпочтения.
+        """
+        return [p.as_dict() for p in self.ranked()]
+
+    async def close(self):
+        for provider in self.providers:
+            await provider.api.close()
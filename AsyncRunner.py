@@ -0,0 +1,48 @@
+import asyncio
+import os
+import threading
+
+# Общий фоновый цикл событий для синхронных обёрток над асинхронным ядром.
+# Один цикл - один пул соединений aiohttp на весь процесс.
+_loop = None
+_thread = None
+_pid = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Возвращает фоновый цикл событий, запуская его при первом обращении.
+    """
+    global _loop, _thread, _pid
+    with _lock:
+        # После fork поток цикла в дочернем процессе не существует: запускаем новый.
+        if _loop is None or _pid != os.getpid():
+            _pid = os.getpid()
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="currency-asyncio", daemon=True)
+            _thread.start()
+    return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    Выполняет корутину в фоновом цикле и блокирует вызывающий поток до результата.
+    :coro: Корутина.
+    :timeout: Максимальное время ожидания в секундах (None - без ограничения).
+    :return: Результат корутины (исключения пробрасываются вызывающему).
+    """
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_sync нельзя вызывать из фонового цикла событий")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def run_async(coro):
+    """
+    Выполняет корутину в фоновом цикле, не блокируя вызывающий цикл событий.
+    :coro: Корутина.
+    :return: Awaitable с результатом корутины.
+    """
+    return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_loop()))
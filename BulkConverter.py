@@ -0,0 +1,171 @@
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from itertools import islice
+
+from ConverterLogging import logger
+
+
+class BulkConverter:
+    def __init__(self, converter, chunk_size=10000, on_error=None):
+        """
+        Потоковая конвертация больших файлов.
+        :converter: Объект CurrencyConverter.
+        :chunk_size: Количество строк, обрабатываемых за один вызов convert_many.
+        :on_error: Приёмник ошибочных строк: вызывается как on_error(номер строки, сообщение).
+            По умолчанию строка пишется в лог предупреждением. Ошибочные строки пропускаются,
+            их число - в stats["rejected"].
+        """
+        self.converter = converter
+        self.chunk_size = chunk_size
+        self.on_error = on_error or self._log_error
+        self.stats = {"converted": 0, "rejected": 0}
+
+    def convert_stream(self, source, target, file_format="csv"):
+        """
+        Читает строки (amount, from, to) из source, конвертирует их блоками
+        фиксированного размера и сразу пишет результат в target.
+        В памяти одновременно находится не больше одного блока. Строки с ошибками
+        (не число, не хватает полей, неизвестная валюта) передаются в on_error и пропускаются.
+        :source: Текстовый поток с входными данными.
+        :target: Текстовый поток для результата.
+        :file_format: "csv" или "jsonl".
+        :return: Количество обработанных строк.
+        """
+        if file_format == "jsonl":
+            rows, write_chunk = self._read_jsonl(source), self._write_jsonl(target)
+        else:
+            rows, write_chunk = self._read_csv(source), self._write_csv(target)
+
+        total = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            # Одна таблица на блок: по ней отсеиваются неизвестные валюты и считаются курсы.
+            snapshot = self.converter.cache.get_snapshot(self.converter.api)
+            if snapshot is not None:
+                chunk = [row for row in chunk if self._known(row, snapshot)]
+                if not chunk:
+                    continue
+            _, amounts, from_codes, to_codes = zip(*chunk)
+            results = self.converter.convert_many(from_codes, to_codes, amounts, snapshot=snapshot)
+            write_chunk(chunk, results)
+            total += len(chunk)
+        target.flush()
+        self.stats["converted"] += total
+        return total
+
+    def _known(self, row, snapshot):
+        line, _, from_code, to_code = row
+        if snapshot.get_rate(from_code, to_code) is None:
+            self._reject(line, f"нет курса для {from_code}/{to_code}")
+            return False
+        return True
+
+    def _reject(self, line, message):
+        self.stats["rejected"] += 1
+        self.on_error(line, message)
+
+    @staticmethod
+    def _log_error(line, message):
+        logger.warning("Строка %d пропущена: %s", line, message)
+
+    def _read_csv(self, source):
+        reader = csv.reader(source)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < 3:
+                self._reject(reader.line_num, "ожидается amount, from, to")
+                continue
+            try:
+                amount = float(row[0])
+            except ValueError:
+                if reader.line_num > 1:  # заголовком может быть только первая строка
+                    self._reject(reader.line_num, f"сумма не число: {row[0]!r}")
+                continue
+            if not math.isfinite(amount):
+                self._reject(reader.line_num, f"сумма не число: {row[0]!r}")
+                continue
+            yield reader.line_num, amount, row[1].strip().upper(), row[2].strip().upper()
+
+    def _read_jsonl(self, source):
+        for line, text in enumerate(source, 1):
+            if not text.strip():
+                continue
+            try:
+                item = json.loads(text)
+                amount, from_code, to_code = float(item["amount"]), item["from"].upper(), item["to"].upper()
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                self._reject(line, f"ожидается объект с amount, from, to ({e})")
+                continue
+            if not math.isfinite(amount):
+                self._reject(line, f"сумма не число: {item['amount']!r}")
+                continue
+            yield line, amount, from_code, to_code
+
+    @staticmethod
+    def _write_csv(target):
+        writer = csv.writer(target, lineterminator="\n")
+        writer.writerow(["amount", "from", "to", "result"])
+
+        def write_chunk(chunk, results):
+            writer.writerows((a, f, t, float(r)) for (_, a, f, t), r in zip(chunk, results))
+        return write_chunk
+
+    @staticmethod
+    def _write_jsonl(target):
+        def write_chunk(chunk, results):
+            target.writelines(
+                json.dumps({"amount": a, "from": f, "to": t, "result": float(r)}) + "\n"
+                for (_, a, f, t), r in zip(chunk, results))
+        return write_chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Потоковая конвертация CSV/JSONL файла (amount, from, to).")
+    parser.add_argument("input", nargs="?", default="-", help="Путь к файлу или '-' для stdin")
+    parser.add_argument("-o", "--output", default="-", help="Путь к файлу результата или '-' для stdout")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], help="Формат файла (по умолчанию - по расширению)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--api-url", default="https://api.exchangerate-api.com/v4/latest/USD")
+    args = parser.parse_args(argv)
+
+    from ConverterLogging import setup_logging
+    from CurrencyAPI import CurrencyAPI
+    from CurrencyCache import CurrencyCache
+    from CurrencyConverter import CurrencyConverter
+    from CurrencyFormatter import CurrencyFormatter
+
+    setup_logging()
+    file_format = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv")
+    api = CurrencyAPI(args.api_url)
+    cache = CurrencyCache()
+    bulk = BulkConverter(CurrencyConverter(cache, CurrencyFormatter(), api), args.chunk_size)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        start = time.perf_counter()
+        total = bulk.convert_stream(source, target, file_format)
+        elapsed = time.perf_counter() - start
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+        cache.close()
+        api.close()
+
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Обработано строк: {total} за {elapsed:.2f} с ({rate:,.0f} строк/с)", file=sys.stderr)
+    if bulk.stats["rejected"]:
+        print(f"Пропущено строк с ошибками: {bulk.stats['rejected']} (подробности в логе)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from Metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_CODES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}  # значения gauge currency_api_circuit_state
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, half_open_probes=1, name="default",
+                 clock=time.monotonic):
+        """
+        Предохранитель поставщика курсов.
+        Замкнут - запросы идут к поставщику. После failure_threshold сбоев подряд размыкается:
+        reset_timeout секунд запросы не отправляются (CircuitOpen), и кэш отдаёт последнюю
+        известную таблицу. Затем полуоткрыт: пропускает half_open_probes пробных запросов;
+        успешная проба замыкает предохранитель, сбой - снова размыкает на reset_timeout.
+        :failure_threshold: Сбоев подряд до размыкания.
+        :reset_timeout: Сколько секунд предохранитель остаётся разомкнутым.
+        :half_open_probes: Сколько пробных запросов одновременно пропускается в полуоткрытом состоянии.
+        :name: Метка api в метриках.
+        :clock: Монотонные часы.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.name = name
+        self.clock = clock
+        self.stats = {"failures": 0, "successes": 0, "rejected": 0, "opened": 0, "closed": 0}
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0  # сбоев подряд
+        self._opened_at = 0.0
+        self._probes = 0  # пробных запросов в полёте
+
+    @property
+    def state(self):
+        """
+        CLOSED, OPEN или HALF_OPEN (разомкнутый переходит в полуоткрытый по истечении reset_timeout).
+        """
+        with self._lock:
+            self._expire()
+            return self._state
+
+    def allow(self):
+        """
+        Можно ли отправить запрос. В полуоткрытом состоянии разрешение - это пробный запрос:
+        его исход нужно сообщить через record_success / record_failure или вернуть через release.
+        :return: True, если запрос можно отправить.
+        """
+        with self._lock:
+            self._expire()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.stats["rejected"] += 1
+        if metrics.enabled:
+            metrics.inc("currency_api_circuit_rejected_total", api=self.name)
+        return False
+
+    def retry_after(self):
+        """
+        Через сколько секунд разомкнутый предохранитель пропустит пробный запрос.
+        """
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self._opened_at + self.reset_timeout - self.clock(), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def release(self):
+        """
+        Возвращает разрешение, если запрос так и не был отправлен или был отменён без результата.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+
+    def _expire(self):
+        if self._state == OPEN and self.clock() >= self._opened_at + self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state):
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+            self.stats["opened"] += 1
+        elif state == CLOSED:
+            self.stats["closed"] += 1
+        self._probes = 0
+        if metrics.enabled:
+            metrics.inc("currency_api_circuit_transitions_total", api=self.name, state=state)
+            metrics.set("currency_api_circuit_state", STATE_CODES[state], api=self.name)
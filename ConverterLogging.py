@@ -0,0 +1,146 @@
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import threading
+
+# Все модули конвертера пишут в этот логгер. Пока setup_logging не вызван,
+# записи уровня INFO отбрасываются до форматирования (логгер корня - WARNING).
+logger = logging.getLogger("currency_converter")
+
+_writer = None
+_lock = threading.Lock()
+
+
+class SampledLogger:
+    def __init__(self, logger, every=1000):
+        """
+        Выборка частых записей (по одной на конвертацию): пишется только каждая every-я.
+        Решение принимается до вызова логгера, поэтому пропущенная запись не создаёт
+        LogRecord и не ищет место вызова (findCaller) - это дороже самой конвертации.
+        :logger: Логгер, в который пишутся выбранные записи.
+        :every: Период выборки (1 - писать все).
+        """
+        self.logger = logger
+        self.every = every
+        self._counter = itertools.count()
+
+    def info(self, msg, *args):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        n = next(self._counter)
+        if n % self.every:
+            return
+        if n:
+            msg = f"[1 из {self.every}, всего {n + 1}] {msg}"
+        self.logger.info(msg, *args, stacklevel=2)
+
+
+# Частые записи конвертера: в файл попадает только каждая sample_every-я (см. setup_logging).
+sampled_logger = SampledLogger(logger)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт запись в очередь как есть: форматирование сообщения
+    выполняется в фоновом потоке, а не в вызывающем коде.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler, который сбрасывает буфер на диск пачками, а не после каждой записи.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class LogWriter(threading.Thread):
+    def __init__(self, log_queue, handler, batch_size=500):
+        """
+        Фоновый поток: забирает записи из очереди пачками и пишет их в файл.
+        :log_queue: Очередь записей.
+        :handler: BatchingRotatingFileHandler.
+        :batch_size: Максимальное число записей между сбросами на диск.
+        """
+        super().__init__(name="currency-log-writer", daemon=True)
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+
+    def run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is None:
+                    running = False
+                else:
+                    self.handler.handle(record)
+            self.handler.flush_batch()
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+        self.handler.close()
+
+
+def setup_logging(filename="currency_converter.log", level=logging.INFO, max_bytes=5 * 1024 * 1024,
+                  backup_count=3, sample_every=1000):
+    """
+    Настраивает асинхронную запись логов конвертера (повторные вызовы ничего не меняют).
+    :filename: Файл лога (UTF-8).
+    :level: Минимальный уровень записей.
+    :max_bytes: Размер файла, после которого он ротируется.
+    :backup_count: Сколько старых файлов хранить.
+    :sample_every: Период выборки записей sampled_logger.
+    """
+    global _writer
+    with _lock:
+        if _writer is not None:
+            return logger
+
+        handler = BatchingRotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count,
+                                              encoding="utf-8")
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = LazyQueueHandler(log_queue)
+
+        sampled_logger.every = sample_every
+        logger.addHandler(queue_handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        _writer = LogWriter(log_queue, handler)
+        _writer.start()
+        atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """
+    Дописывает оставшиеся записи в файл и останавливает фоновый поток.
+    """
+    global _writer
+    with _lock:
+        if _writer is None:
+            return
+        for handler in list(logger.handlers):
+            if isinstance(handler, LazyQueueHandler):
+                logger.removeHandler(handler)
+        _writer.stop()
+        _writer = None
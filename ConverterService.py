@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import math
+
+from aiohttp import web
+
+from AbstractFormatter import MAX_DECIMAL_PLACES
+from CircuitBreaker import CircuitBreaker
+from ConverterLogging import logger, setup_logging
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from CurrencyConverter import CurrencyConverter
+from CurrencyErrors import DeadlineExceeded, RateUnavailable
+from CurrencyFormatter import CurrencyFormatter, FancyCurrencyFormatter
+from Metrics import metrics
+
+FORMATTERS = {"ru": CurrencyFormatter, "en": FancyCurrencyFormatter}
+# Пакеты больше этого размера конвертируются в пуле потоков, чтобы не задерживать цикл событий.
+EXECUTOR_BATCH_SIZE = 10000
+
+
+class ConverterService:
+    def __init__(self, api_url, max_concurrency=256, store=None, refresh_policy=None, request_timeout=5.0,
+                 breaker=None):
+        """
+        HTTP-сервис конвертации на asyncio (aiohttp.web), без PyQt.
+        :api_url: URL таблицы курсов.
+        :max_concurrency: Максимальное число одновременно обрабатываемых запросов.
+        :store: Необязательное постоянное хранилище курсов.
+        :refresh_policy: Необязательный RefreshPolicy для фонового обновления курсов.
+        :request_timeout: Срок ожидания таблицы курсов на один HTTP-запрос в секундах (дальше - 504).
+        :breaker: CircuitBreaker поставщика (по умолчанию - с параметрами CircuitBreaker).
+        """
+        self.api = CurrencyAPI(api_url, breaker=breaker or CircuitBreaker(name=api_url))
+        self.request_timeout = request_timeout
+        self.cache = CurrencyCache(store=store, refresh_policy=refresh_policy)
+        self.converters = {name: CurrencyConverter(self.cache, formatter(), self.api)
+                           for name, formatter in FORMATTERS.items()}
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._runner = None
+
+    def make_app(self):
+        app = web.Application(middlewares=[self._limit_concurrency])
+        app.add_routes([
+            web.get("/convert", self.handle_convert),
+            web.post("/convert/batch", self.handle_batch),
+            web.get("/rates", self.handle_rates),
+            web.get("/metrics", self.handle_metrics),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _on_cleanup(self, app):
+        self.cache.close()
+        self.api.close()
+
+    @web.middleware
+    async def _limit_concurrency(self, request, handler):
+        async with self._semaphore:
+            try:
+                return await handler(request)
+            except ValueError as e:
+                return web.json_response({"error": str(e)}, status=400)
+            except DeadlineExceeded as e:
+                return web.json_response({"error": str(e)}, status=504)
+            except RateUnavailable as e:
+                retry_after = getattr(e, "retry_after", None)
+                headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after else None
+                return web.json_response({"error": str(e)}, status=503, headers=headers)
+
+    async def _snapshot(self):
+        snapshot = await self.cache.get_snapshot_async(self.api, self.request_timeout)
+        if snapshot is None:
+            raise web.HTTPServiceUnavailable(text='{"error": "курсы недоступны"}', content_type="application/json")
+        return snapshot
+
+    @staticmethod
+    def _check_currencies(snapshot, *codes):
+        for code in codes:
+            if code not in snapshot.rates:
+                raise ValueError(f"Валюта '{code}' не поддерживается")
+
+    @staticmethod
+    def _decimal_places(value):
+        # Из строки запроса приходит строка, из JSON - только целое (не null, не bool, не 2.5).
+        if isinstance(value, str):
+            value = int(value) if value.strip().lstrip("-").isdigit() else None
+        if type(value) is not int or not 0 <= value <= MAX_DECIMAL_PLACES:
+            raise ValueError(f"decimal_places должно быть целым от 0 до {MAX_DECIMAL_PLACES}")
+        return value
+
+    @staticmethod
+    def _codes(value, name):
+        # Коды приводятся к верхнему регистру, как в handle_convert.
+        if isinstance(value, str):
+            return value.upper()
+        if isinstance(value, list) and all(isinstance(code, str) for code in value):
+            return [code.upper() for code in value]
+        raise ValueError(f"Поле {name} должно быть кодом валюты или списком кодов")
+
+    def _converter(self, name):
+        converter = self.converters.get(name or "ru")
+        if converter is None:
+            raise ValueError(f"Неизвестный формат: {name}")
+        return converter
+
+    async def handle_convert(self, request):
+        """
+        GET /convert?from=USD&to=EUR&amount=10[&decimal_places=2&format=ru|en]
+        """
+        query = request.query
+        from_currency = query.get("from", "").upper()
+        to_currency = query.get("to", "").upper()
+        amount = float(query.get("amount", ""))
+        if not math.isfinite(amount):
+            raise ValueError("Сумма должна быть конечным числом")
+        decimal_places = self._decimal_places(query.get("decimal_places", 2))
+        converter = self._converter(query.get("format"))
+
+        snapshot = await self._snapshot()
+        self._check_currencies(snapshot, from_currency, to_currency)
+        # Курс, сумма и строка результата - из одной таблицы; convert с snapshot= не обращается к кэшу и сети.
+        rate = snapshot.get_rate(from_currency, to_currency)
+        result = converter.convert(from_currency, to_currency, amount, decimal_places, snapshot=snapshot)
+        return web.json_response({"from": from_currency, "to": to_currency, "amount": amount, "rate": rate,
+                                  "converted": amount * rate, "result": result})
+
+    async def handle_batch(self, request):
+        """
+        POST /convert/batch {"from": "USD" | [...], "to": "EUR" | [...], "amounts": [...],
+                             "decimal_places": 2, "format": "ru" | "en" | null}
+        """
+        body = await request.json()
+        if not isinstance(body, dict):
+            raise ValueError("Тело запроса должно быть объектом JSON")
+        from_currency, to_currency, amounts = body.get("from"), body.get("to"), body.get("amounts")
+        if from_currency is None or to_currency is None or not isinstance(amounts, list):
+            raise ValueError("Нужны поля from, to и amounts")
+        from_currency = self._codes(from_currency, "from")
+        to_currency = self._codes(to_currency, "to")
+        for codes in (from_currency, to_currency):
+            if isinstance(codes, list) and len(codes) != len(amounts):
+                raise ValueError("Списки from и to должны быть той же длины, что и amounts")
+        if not all(type(a) in (int, float) and math.isfinite(a) for a in amounts):
+            raise ValueError("amounts должен быть списком конечных чисел")
+        decimal_places = self._decimal_places(body.get("decimal_places", 2))
+        format_name = body.get("format")
+        converter = self._converter(format_name)
+
+        snapshot = await self._snapshot()
+        codes = set([from_currency] if isinstance(from_currency, str) else from_currency)
+        codes.update([to_currency] if isinstance(to_currency, str) else to_currency)
+        self._check_currencies(snapshot, *codes)
+
+        def convert():
+            # snapshot=: пакет считается по уже полученной таблице, без синхронного обращения к кэшу.
+            result = converter.convert_many(from_currency, to_currency, amounts, decimal_places,
+                                            format=format_name is not None, snapshot=snapshot)
+            return result.tolist() if hasattr(result, "tolist") else list(result)
+
+        if len(amounts) >= EXECUTOR_BATCH_SIZE:
+            results = await asyncio.get_running_loop().run_in_executor(None, convert)
+        else:
+            results = convert()
+        return web.json_response({"results": results})
+
+    async def handle_rates(self, request):
+        """
+        GET /rates - текущая таблица курсов.
+        """
+        snapshot = await self._snapshot()
+        return web.json_response({"base": snapshot.base, "timestamp": snapshot.timestamp.isoformat(),
+                                  "rates": snapshot.rates})
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Запускает сервис в текущем цикле событий.
+        :return: Фактический порт (полезно при port=0).
+        """
+        self._runner = web.AppRunner(self.make_app(), keepalive_timeout=75.0, shutdown_timeout=10.0)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return self._runner.addresses[0][1]
+
+    async def stop(self):
+        """
+        Плавная остановка: новые соединения не принимаются, текущие запросы дорабатывают.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP-сервис конвертации валют")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--api-url", default="https://api.exchangerate-api.com/v4/latest/USD")
+    parser.add_argument("--max-concurrency", type=int, default=256)
+    parser.add_argument("--request-timeout", type=float, default=5.0, help="Срок ожидания курсов, секунды")
+    parser.add_argument("--metrics", action="store_true", help="Включить сбор метрик (/metrics)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if args.metrics:
+        metrics.enable()
+    service = ConverterService(args.api_url, args.max_concurrency, request_timeout=args.request_timeout)
+    logger.info("Сервис конвертации: http://%s:%s", args.host, args.port)
+    # run_app обрабатывает SIGINT/SIGTERM и вызывает on_cleanup при остановке.
+    web.run_app(service.make_app(), host=args.host, port=args.port, keepalive_timeout=75.0,
+                shutdown_timeout=10.0, print=None)
+
+
+if __name__ == "__main__":
+    main()
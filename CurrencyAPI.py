@@ -1,13 +1,44 @@
-import requests
-from datetime import datetime, timedelta
+from AsyncCurrencyAPI import AsyncCurrencyAPI
+from AsyncRunner import run_sync
+from Deadline import Deadline
 class CurrencyAPI:
-    def __init__(self, api_url):
+    def __init__(self, api_url, **options):
+        """
+        Синхронная обёртка над AsyncCurrencyAPI.
+        Запросы выполняются в общем фоновом цикле событий.
+        :api_url: URL таблицы курсов.
+        :options: Параметры AsyncCurrencyAPI (pool_size, connect_timeout, read_timeout, conditional_get, limiter,
+                  request_timeout, breaker, compression).
+        """
         self.api_url = api_url
+        self.async_api = AsyncCurrencyAPI(api_url, **options)
 
-    def get_exchange_rate(self, from_currency, to_currency):
-        response = requests.get(self.api_url)
-        if response.status_code == 200:
-            data = response.json()
-            rates = data.get("rates", {})
-            return rates.get(to_currency) / rates.get(from_currency)
-        return None
\ No newline at end of file
+    @property
+    def limiter(self):
+        return self.async_api.limiter
+
+    @property
+    def breaker(self):
+        return self.async_api.breaker
+
+    @property
+    def stats(self):
+        """
+        Счётчики запросов, ответов 304, полученных байт и переиспользования соединений.
+        """
+        return self.async_api.stats
+
+    def get_snapshot(self, deadline=None):
+        """
+        Загружает всю таблицу курсов одним запросом.
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: RateSnapshot.
+        :raises RateUnavailable: Таблица не получена (ProviderError, DeadlineExceeded, CircuitOpen, QuotaExhausted).
+        """
+        return run_sync(self.async_api.get_snapshot(Deadline.of(deadline)))
+
+    def get_exchange_rate(self, from_currency, to_currency, deadline=None):
+        return run_sync(self.async_api.get_exchange_rate(from_currency, to_currency, Deadline.of(deadline)))
+
+    def close(self):
+        run_sync(self.async_api.close())
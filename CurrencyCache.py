@@ -1,37 +1,98 @@
-import requests
-from datetime import datetime, timedelta
+from AsyncCurrencyCache import AsyncCurrencyCache
+from AsyncRunner import get_loop, run_async, run_sync
+from CurrencyErrors import RateUnavailable
+from Deadline import Deadline
 class CurrencyCache:
-    def __init__(self):
+    def __init__(self, store=None, maxsize=128, refresh_policy=None, history=None):
         """
         Инициализация кэша.
+        Синхронная обёртка над AsyncCurrencyCache.
+        :store: Необязательное постоянное хранилище (например, SQLiteRateStore).
+        :maxsize: Максимальное число таблиц (по одной на URL API) в памяти.
+        :refresh_policy: Необязательный RefreshPolicy для фонового обновления таблиц.
+        :history: Необязательный HistoricalRateStore для истории загруженных таблиц.
         """
-        self.cache = {}
-        self.cache_duration = timedelta(hours=1)  # Кэш актуален 1 час
+        # Фоновые обновления - в общем цикле AsyncRunner, даже если кэш начал с таблицы из store.
+        self.core = AsyncCurrencyCache(store, maxsize, refresh_policy, history, loop=get_loop)
 
-    def get_rate(self, from_currency, to_currency, api):
+    @property
+    def cache(self):
+        return self.core.cache  # TTLCache: api_url -> RateSnapshot
+
+    @property
+    def history(self):
+        return self.core.history  # HistoricalRateStore или None
+
+    @property
+    def stats(self):
+        """
+        Счётчики попаданий, промахов, вытеснений и истечений кэша.
+        """
+        return self.core.cache.stats
+
+    @property
+    def cache_duration(self):
+        return self.core.cache_duration  # Кэш актуален 1 час
+
+    @cache_duration.setter
+    def cache_duration(self, value):
+        self.core.cache_duration = value
+
+    def get_snapshot(self, api, deadline=None):
+        """
+        Получает таблицу курсов из кэша или API.
+        Одна загрузка таблицы обслуживает все пары валют.
+        :api: Объект CurrencyAPI для запроса таблицы, если её нет в кэше.
+        :deadline: Срок вызова (Deadline или секунды): дольше вызывающий поток не ждёт.
+        :return: RateSnapshot или None, если API вернул пустой ответ.
+        :raises RateUnavailable: Таблицы нет ни в кэше, ни у API.
+        """
+        async_api = getattr(api, "async_api", api)
+        # Актуальная таблица отдаётся прямо в вызывающем потоке, без перехода в цикл событий.
+        snapshot = self.core.lookup(async_api)
+        if snapshot is not None:
+            return snapshot
+        return run_sync(self.core.fetch_snapshot(async_api, Deadline.of(deadline)))
+
+    async def get_snapshot_async(self, api, deadline=None):
+        """
+        То же, что get_snapshot, но для вызова из другого цикла событий:
+        ожидание загрузки не блокирует этот цикл.
+        :api: Объект CurrencyAPI.
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: RateSnapshot или None, если API вернул пустой ответ.
+        """
+        async_api = getattr(api, "async_api", api)
+        snapshot = self.core.lookup(async_api)
+        if snapshot is not None:
+            return snapshot
+        return await run_async(self.core.fetch_snapshot(async_api, Deadline.of(deadline)))
+
+    def get_rate(self, from_currency, to_currency, api, deadline=None):
         """
         Получает курс из кэша или API.
         :from_currency: Исходная валюта.
         :to_currency: Целевая валюта.
         :api: Объект CurrencyAPI для запроса курса, если его нет в кэше.
-        :Курс валюты (float).
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: Курс (float) или None, если валюты нет в таблице.
+        :raises RateUnavailable: Таблица курсов недоступна.
         """
-        cache_key = f"{from_currency}_{to_currency}"
-        if cache_key in self.cache:
-            rate, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < self.cache_duration:
-                return rate
+        snapshot = self.get_snapshot(api, deadline)
+        if snapshot is None:
+            raise RateUnavailable(f"{api.api_url}: таблица курсов недоступна")
+        return snapshot.get_rate(from_currency, to_currency)
 
-        rate = api.get_exchange_rate(from_currency, to_currency)
-        self.update_cache(from_currency, to_currency, rate)
-        return rate
-
-    def update_cache(self, from_currency, to_currency, rate):
+    def update_cache(self, api, snapshot):
         """
         Обновляет кэш.
-        :from_currency: Исходная валюта.
-        :to_currency: Целевая валюта.
-        :rate: Курс валюты.
+        :api: Объект CurrencyAPI, от которого получена таблица.
+        :snapshot: Снимок таблицы курсов (RateSnapshot).
+        """
+        self.core.update_cache(getattr(api, "async_api", api), snapshot)
+
+    def close(self):
+        """
+        Отменяет запланированные фоновые обновления.
         """
-        cache_key = f"{from_currency}_{to_currency}"
-        self.cache[cache_key] = (rate, datetime.now())
\ No newline at end of file
+        self.core.close()
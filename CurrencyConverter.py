@@ -1,21 +1,209 @@
-import logging
+import time
 
-logging.basicConfig(filename='currency_converter.log', level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+from ConverterLogging import logger, sampled_logger
+from CurrencyErrors import RateUnavailable, UnknownCurrency
+from Deadline import Deadline
+from FixedPointEngine import FixedPointEngine
+from LazyImport import LazyModule
+from Metrics import metrics
+from RateMatrix import RateMatrix
+
+# NumPy необязателен: без него convert_many работает на списках.
+# Импортируется при первом пакетном вызове, а не при запуске программы.
+np = LazyModule("numpy")
 
 class CurrencyConverter:
-    def __init__(self, cache, formatter, api):
+    def __init__(self, cache, formatter, api, history=None):
+        """
+        :cache: Кэш курсов (CurrencyCache или SharedRateCache).
+        :formatter: Форматтер результата.
+        :api: API курсов.
+        :history: HistoricalRateStore для конвертации на дату (at=); по умолчанию - история кэша, если есть.
+        """
         self.cache = cache
         self.formatter = formatter
         self.api = api
-        logging.info(f"Инициализация CurrencyConverter с форматтером: {formatter.__class__.__name__}")
+        self.history = history if history is not None else getattr(cache, "history", None)
+        self.fixed_point = FixedPointEngine()
+        self.matrix = RateMatrix()  # кросс-курсы текущей таблицы по ID валют
+        self._matrix_snapshot = None
+        logger.info("Инициализация CurrencyConverter с форматтером: %s", formatter.__class__.__name__)
 
-    def convert(self, from_currency, to_currency, amount, decimal_places=2):
-        logging.info(f"Конвертация: {amount} {from_currency} -> {to_currency} с {decimal_places} знаками после запятой")
-        rate = self.cache.get_rate(from_currency, to_currency, self.api)
-        logging.info(f"Курс обмена: {rate}")
+    def convert(self, from_currency, to_currency, amount, decimal_places=2, at=None, deadline=None, snapshot=None):
+        """
+        Конвертирует сумму по текущему (или историческому, at=) курсу и форматирует результат.
+        :deadline: Срок вызова (Deadline или секунды): дольше загрузка курсов не ждётся (DeadlineExceeded).
+        :snapshot: Уже полученная таблица (RateSnapshot): курс берётся из неё, без обращения к кэшу.
+        :raises UnknownCurrency: Валюты нет в таблице курсов.
+        :raises RateUnavailable: Таблица курсов недоступна (ошибка поставщика, срок, предохранитель).
+        """
+        measured = metrics.enabled
+        if measured:
+            start = time.perf_counter()
+        if at is None:
+            rate = self._rate(from_currency, to_currency, deadline, snapshot)
+        else:
+            rate = self._historical_rate(from_currency, to_currency, at)
+        if measured:
+            rate_done = time.perf_counter()
         converted_amount = amount * rate
-        logging.info(f"Результат конвертации до форматирования: {converted_amount} {to_currency}")
         result = self.formatter.format(converted_amount, to_currency, decimal_places)
-        logging.info(f"Форматированный результат: {result}")
-        return result
\ No newline at end of file
+        if measured:
+            self._record_convert(from_currency, to_currency, start, rate_done, time.perf_counter())
+        sampled_logger.info("Конвертация: %s %s -> %s по курсу %s = %s", amount, from_currency, to_currency, rate,
+                            result)
+        return result
+
+    def convert_many(self, from_currency, to_currency, amounts, decimal_places=2, format=False, at=None,
+                     deadline=None, snapshot=None):
+        """
+        Пакетная конвертация массива сумм.
+        Курс запрашивается один раз на каждую различную пару валют (для массивов кодов -
+        выборкой из матрицы кросс-курсов), сами суммы пересчитываются одним векторным умножением.
+        :from_currency: Код исходной валюты или массив кодов (по одному на сумму).
+        :to_currency: Код целевой валюты или массив кодов (по одному на сумму).
+        :amounts: Массив сумм (list, tuple или numpy.ndarray).
+        :decimal_places: Количество знаков после запятой при форматировании.
+        :format: Если True, вернуть список строк форматтера вместо чисел.
+        :at: Дата или момент времени: конвертировать по историческому курсу (нужен history).
+        :deadline: Срок вызова (Deadline или секунды), общий для всех запрашиваемых курсов.
+        :snapshot: Уже полученная таблица (RateSnapshot): все курсы берутся из неё, без обращения к кэшу.
+        :return: numpy.ndarray (или list без NumPy) сконвертированных сумм.
+        """
+        start = time.perf_counter() if metrics.enabled else None
+        deadline = Deadline.of(deadline)
+        if at is None:
+            rate_of = lambda f, t: self._rate(f, t, deadline, snapshot)
+        else:
+            rate_of = lambda f, t: self._historical_rate(f, t, at)
+        if np:
+            vectorized = at is None and not (isinstance(from_currency, str) and isinstance(to_currency, str))
+            matrix = self.rate_matrix(deadline, snapshot) if vectorized else None
+            result, targets = self._convert_many_numpy(from_currency, to_currency, amounts, rate_of, matrix)
+        else:
+            result, targets = self._convert_many_list(from_currency, to_currency, amounts, rate_of)
+        if start is not None:
+            metrics.observe("currency_convert_many_seconds", time.perf_counter() - start)
+            metrics.inc("currency_convert_many_rows_total", len(result))
+        logger.info("Пакетная конвертация: %d сумм", len(result))
+
+        if not format:
+            return result
+        return self.formatter.format_many(result, to_currency if isinstance(to_currency, str) else targets,
+                                          decimal_places)
+
+    @staticmethod
+    def _record_convert(from_currency, to_currency, start, rate_done, end):
+        pair = f"{from_currency}_{to_currency}"
+        metrics.inc("currency_conversions_total", pair=pair)
+        metrics.observe("currency_convert_stage_seconds", rate_done - start, stage="rate", pair=pair)
+        metrics.observe("currency_convert_stage_seconds", end - rate_done, stage="format", pair=pair)
+        metrics.observe("currency_convert_seconds", end - start, pair=pair)
+
+    def convert_minor(self, from_currency, to_currency, minor_amounts, rounding=None, at=None, deadline=None):
+        """
+        Точная пакетная конвертация сумм в минимальных единицах (центы, иены).
+        Суммы и курсы - целые числа, поэтому результат не содержит ошибок float
+        и одинаков на любой платформе.
+        :from_currency: Код исходной валюты или массив кодов (по одному на сумму).
+        :to_currency: Код целевой валюты или массив кодов (по одному на сумму).
+        :minor_amounts: Целые суммы в минимальных единицах исходной валюты.
+        :rounding: Режим округления FixedPointEngine (по умолчанию half_even).
+        :at: Дата или момент времени: конвертировать по историческому курсу (нужен history).
+        :deadline: Срок вызова (Deadline или секунды), общий для всех запрашиваемых курсов.
+        :return: Целые суммы в минимальных единицах целевой валюты (numpy.ndarray int64 или list).
+        """
+        engine = self.fixed_point
+        deadline = Deadline.of(deadline)
+
+        def scaled_rate(f, t):
+            rate = self._rate(f, t, deadline) if at is None else self._historical_rate(f, t, at)
+            return engine.scale_rate(rate, f, t)
+
+        if np:
+            minor_amounts = np.asarray(minor_amounts, dtype=np.int64)
+            rates, _ = self._pair_rates_numpy(from_currency, to_currency, minor_amounts.shape, scaled_rate, np.int64)
+        else:
+            minor_amounts = list(minor_amounts)
+            rates, _ = self._pair_rates_list(from_currency, to_currency, len(minor_amounts), scaled_rate)
+        return engine.convert_minor(minor_amounts, rates, rounding)
+
+    def rate_matrix(self, deadline=None, snapshot=None):
+        """
+        Матрица кросс-курсов текущей таблицы. Обновляется, только когда кэш вернул
+        другую таблицу, и лишь в строках и столбцах изменившихся курсов.
+        :deadline: Срок вызова (Deadline или секунды).
+        :snapshot: Таблица, по которой построить матрицу (по умолчанию - текущая таблица кэша).
+        :return: RateMatrix или None, если таблица недоступна.
+        """
+        if snapshot is None:
+            snapshot = self.cache.get_snapshot(self.api, deadline)
+        if snapshot is None:
+            return None
+        if snapshot is not self._matrix_snapshot:
+            self.matrix.update(snapshot)
+            self._matrix_snapshot = snapshot
+        return self.matrix
+
+    def _rate(self, from_currency, to_currency, deadline=None, snapshot=None):
+        if snapshot is not None:
+            rate = snapshot.get_rate(from_currency, to_currency)
+        else:
+            rate = self.cache.get_rate(from_currency, to_currency, self.api, deadline)
+        if rate is None:
+            raise UnknownCurrency(from_currency, to_currency)
+        return rate
+
+    def _historical_rate(self, from_currency, to_currency, at):
+        if self.history is None:
+            raise RateUnavailable("Для конвертации на дату нужен HistoricalRateStore (history=...)")
+        rate = self.history.get_rate(from_currency, to_currency, at)
+        if rate is None:
+            if from_currency not in self.history.index or to_currency not in self.history.index:
+                raise UnknownCurrency(from_currency, to_currency)
+            raise RateUnavailable(f"Нет исторического курса {from_currency}/{to_currency} на {at}")
+        return rate
+
+    def _convert_many_numpy(self, from_currency, to_currency, amounts, rate_of, matrix=None):
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if matrix is not None:
+            from_codes, to_codes = np.broadcast_arrays(np.asarray(from_currency), np.asarray(to_currency))
+            return amounts * matrix.get_rates(from_codes, to_codes).reshape(amounts.shape), to_codes
+        rates, targets = self._pair_rates_numpy(from_currency, to_currency, amounts.shape, rate_of, np.float64)
+        return amounts * rates, targets
+
+    def _convert_many_list(self, from_currency, to_currency, amounts, rate_of):
+        amounts = list(amounts)
+        rates, targets = self._pair_rates_list(from_currency, to_currency, len(amounts), rate_of)
+        return [a * r for a, r in zip(amounts, rates)], targets
+
+    @staticmethod
+    def _pair_rates_numpy(from_currency, to_currency, shape, rate_of, dtype):
+        """
+        Курс для каждой суммы; rate_of вызывается один раз на различную пару.
+        :return: (скаляр или массив курсов формы shape, массив целевых валют)
+        """
+        if isinstance(from_currency, str) and isinstance(to_currency, str):
+            return rate_of(from_currency, to_currency), np.broadcast_to(np.array(to_currency), shape)
+
+        from_codes, to_codes = np.broadcast_arrays(np.asarray(from_currency), np.asarray(to_currency))
+        from_unique, from_index = np.unique(from_codes, return_inverse=True)
+        to_unique, to_index = np.unique(to_codes, return_inverse=True)
+        pair_index = from_index.reshape(-1) * len(to_unique) + to_index.reshape(-1)
+        pairs, pair_inverse = np.unique(pair_index, return_inverse=True)
+
+        rates = np.empty(len(pairs), dtype=dtype)
+        for i, pair in enumerate(pairs):
+            f, t = divmod(int(pair), len(to_unique))
+            rates[i] = rate_of(str(from_unique[f]), str(to_unique[t]))
+        return rates[pair_inverse].reshape(shape), to_codes
+
+    @staticmethod
+    def _pair_rates_list(from_currency, to_currency, count, rate_of):
+        from_codes = [from_currency] * count if isinstance(from_currency, str) else list(from_currency)
+        to_codes = [to_currency] * count if isinstance(to_currency, str) else list(to_currency)
+
+        rates = {}
+        for pair in set(zip(from_codes, to_codes)):
+            rates[pair] = rate_of(*pair)
+        return [rates[pair] for pair in zip(from_codes, to_codes)], to_codes
@@ -3,13 +3,44 @@ from PyQt6.QtWidgets import (
     QRadioButton, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QComboBox, QMessageBox, QButtonGroup, QSpinBox,
     QMenuBar, QMenu)
-from PyQt6.QtCore import Qt, QTranslator, QLocale
+from PyQt6.QtCore import Qt, QTranslator, QLocale, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon, QAction
 from CurrencyAPI import CurrencyAPI
 from CurrencyCache import CurrencyCache
 from CurrencyConverter import CurrencyConverter
 from CurrencyFormatter import CurrencyFormatter, FancyCurrencyFormatter
-from CurrencyValidator import CurrencyValidator
+from CurrencyValidator import SUPPORTED_CURRENCIES, CurrencyValidator
+from RateStore import SQLiteRateStore
+
+CLOSE_WAIT_MS = 2000  # сколько при закрытии окна ждать выполняющуюся конвертацию
+
+
+class ConversionSignals(QObject):
+    finished = pyqtSignal(int, str)  # номер запроса, результат
+    failed = pyqtSignal(int, str, bool)  # номер запроса, сообщение, ошибка ввода (ValueError)
+
+
+class ConversionWorker(QRunnable):
+    def __init__(self, request_id, converter, from_currency, to_currency, amount, decimal_places):
+        """
+        Конвертация в пуле потоков, чтобы запрос к API не блокировал окно.
+        Результат и ошибки возвращаются через сигналы в поток интерфейса.
+        """
+        super().__init__()
+        self.signals = ConversionSignals()
+        self.request_id = request_id
+        self.converter = converter
+        self.args = (from_currency, to_currency, amount, decimal_places)
+
+    def run(self):
+        try:
+            result = self.converter.convert(*self.args)
+        except ValueError as e:
+            self.signals.failed.emit(self.request_id, str(e), True)
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e), False)
+        else:
+            self.signals.finished.emit(self.request_id, result)
 
 
 class CurrencyConverterApp(QMainWindow):
@@ -19,15 +50,20 @@ class CurrencyConverterApp(QMainWindow):
         self.is_dark_theme = False
         self.current_language = "ru"
 
+        self.thread_pool = QThreadPool.globalInstance()
+        self.request_id = 0  # номер последнего запроса, результат которого нужно показать
+        self.worker = None  # выполняющийся запрос (не больше одного)
+        self.pending_request = None  # последний запрос, нажатый во время выполнения
+
 
         self.init_ui()
 
 
         self.api_url = "https://api.exchangerate-api.com/v4/latest/USD"
         self.api = CurrencyAPI(self.api_url)
-        self.cache = CurrencyCache()
+        self.cache = CurrencyCache(store=SQLiteRateStore())  # курсы переживают перезапуск
         self.formatter = CurrencyFormatter()
-        self.validator = CurrencyValidator(valid_currencies={"USD", "EUR", "GBP", "JPY", "RUB"})
+        self.validator = CurrencyValidator(valid_currencies=set(SUPPORTED_CURRENCIES))
         self.converter = CurrencyConverter(self.cache, self.formatter, self.api)
 
 
@@ -53,13 +89,13 @@ class CurrencyConverterApp(QMainWindow):
 
         self.from_currency_label = QLabel()
         self.from_currency_input = QComboBox()
-        self.from_currency_input.addItems(["USD", "EUR", "GBP", "JPY", "RUB"])
+        self.from_currency_input.addItems(list(SUPPORTED_CURRENCIES))
         self.layout.addWidget(self.from_currency_label)
         self.layout.addWidget(self.from_currency_input)
 
         self.to_currency_label = QLabel()
         self.to_currency_input = QComboBox()
-        self.to_currency_input.addItems(["USD", "EUR", "GBP", "JPY", "RUB"])
+        self.to_currency_input.addItems(list(SUPPORTED_CURRENCIES))
         self.layout.addWidget(self.to_currency_label)
         self.layout.addWidget(self.to_currency_input)
 
@@ -103,8 +139,11 @@ class CurrencyConverterApp(QMainWindow):
         self.button_layout = QHBoxLayout()
         self.convert_button = QPushButton()
         self.clear_button = QPushButton()
+        self.cancel_button = QPushButton()
+        self.cancel_button.setEnabled(False)
         self.button_layout.addWidget(self.convert_button)
         self.button_layout.addWidget(self.clear_button)
+        self.button_layout.addWidget(self.cancel_button)
         self.layout.addLayout(self.button_layout)
 
 
@@ -118,6 +157,7 @@ class CurrencyConverterApp(QMainWindow):
 
         self.convert_button.clicked.connect(self.convert_currency)
         self.clear_button.clicked.connect(self.clear_fields)
+        self.cancel_button.clicked.connect(self.cancel_conversion)
         self.decimal_custom.toggled.connect(self.toggle_custom_decimal_input)
 
     def create_menu(self):
@@ -170,6 +210,7 @@ class CurrencyConverterApp(QMainWindow):
             self.decimal_custom.setText("Custom decimal places")
             self.convert_button.setText("Convert")
             self.clear_button.setText("Clear")
+            self.cancel_button.setText("Cancel")
             self.result_label.setText("Result:")
 
             # Меню
@@ -191,6 +232,7 @@ class CurrencyConverterApp(QMainWindow):
             self.decimal_custom.setText("Кастомное количество знаков")
             self.convert_button.setText("Конвертировать")
             self.clear_button.setText("Очистить")
+            self.cancel_button.setText("Отмена")
             self.result_label.setText("Результат:")
 
 
@@ -391,10 +433,11 @@ class CurrencyConverterApp(QMainWindow):
                     "Сумма должна быть положительным числом" if self.current_language == "ru" else "Amount must be positive")
 
 
+            formatter = self.converter.formatter
             if self.format_russian.isChecked():
-                self.converter.formatter = CurrencyFormatter()
+                formatter = CurrencyFormatter()
             elif self.format_english.isChecked():
-                self.converter.formatter = FancyCurrencyFormatter()
+                formatter = FancyCurrencyFormatter()
 
 
             if self.decimal_default.isChecked():
@@ -402,12 +445,77 @@ class CurrencyConverterApp(QMainWindow):
             elif self.decimal_custom.isChecked():
                 decimal_places = self.custom_decimal_input.value()
 
-            result = self.converter.convert(from_currency, to_currency, amount, decimal_places)
-            self.result_output.setText(result)
+            request = (formatter, from_currency, to_currency, amount, decimal_places)
         except ValueError as e:
             QMessageBox.warning(self, "Ошибка" if self.current_language == "ru" else "Error", str(e))
+            return
         except Exception as e:
             QMessageBox.critical(self, "Ошибка" if self.current_language == "ru" else "Error", str(e))
+            return
+
+        self.request_id += 1
+        self.set_busy(True)
+        if self.worker is not None:
+            # Повторные нажатия не ставятся в очередь: выполнится только последнее.
+            self.pending_request = request
+            return
+        self.start_conversion(request)
+
+    def start_conversion(self, request):
+        formatter, from_currency, to_currency, amount, decimal_places = request
+        self.converter.formatter = formatter
+        self.worker = ConversionWorker(self.request_id, self.converter,
+                                       from_currency, to_currency, amount, decimal_places)
+        self.worker.signals.finished.connect(self.on_conversion_finished)
+        self.worker.signals.failed.connect(self.on_conversion_failed)
+        self.thread_pool.start(self.worker)
+
+    def on_conversion_finished(self, request_id, result):
+        if request_id == self.request_id:
+            self.result_output.setText(result)
+        self.next_conversion(request_id)
+
+    def on_conversion_failed(self, request_id, message, is_input_error):
+        if request_id == self.request_id:
+            self.result_output.setText("")
+            title = "Ошибка" if self.current_language == "ru" else "Error"
+            if is_input_error:
+                QMessageBox.warning(self, title, message)
+            else:
+                QMessageBox.critical(self, title, message)
+        self.next_conversion(request_id)
+
+    def next_conversion(self, request_id):
+        self.worker = None
+        if self.pending_request is not None:
+            request, self.pending_request = self.pending_request, None
+            self.start_conversion(request)
+        elif request_id == self.request_id:
+            self.set_busy(False)
+
+    def cancel_conversion(self):
+        # Сетевой запрос нельзя прервать из потока интерфейса: его результат просто не будет показан.
+        self.request_id += 1
+        self.pending_request = None
+        self.set_busy(False)
+        self.result_output.setText("")
+
+    def closeEvent(self, event):
+        # Результат запроса в полёте уже не нужен: ждём его недолго, затем закрываем сессию aiohttp
+        # (незавершённый запрос получит ошибку соединения, и её сигнал будет проигнорирован).
+        self.cancel_conversion()
+        self.thread_pool.waitForDone(CLOSE_WAIT_MS)
+        self.cache.close()
+        self.api.close()
+        super().closeEvent(event)
+
+    def set_busy(self, busy):
+        self.cancel_button.setEnabled(busy)
+        if busy:
+            self.result_output.setText("Конвертация..." if self.current_language == "ru" else "Converting...")
+            self.setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.unsetCursor()
 
     def clear_fields(self):
         self.from_currency_input.setCurrentIndex(0)
@@ -0,0 +1,65 @@
+class RateError(Exception):
+    """
+    Базовая ошибка получения курсов.
+    """
+
+
+class RateUnavailable(RateError):
+    """
+    Таблица курсов не получена: поставщик недоступен, ответил ошибкой или не успел к сроку.
+    """
+
+
+class ProviderError(RateUnavailable):
+    def __init__(self, api_url, status=None, message=None):
+        """
+        Поставщик курсов ответил ошибкой или некорректной таблицей.
+        :api_url: URL таблицы курсов.
+        :status: HTTP-статус ответа (None - ответа не было: ошибка соединения).
+        :message: Описание ошибки (по умолчанию - по статусу).
+        """
+        super().__init__(message or f"{api_url}: поставщик курсов ответил {status}")
+        self.api_url = api_url
+        self.status = status
+
+
+class DeadlineExceeded(RateUnavailable, TimeoutError):
+    """
+    Срок вызова истёк раньше, чем была получена таблица курсов.
+    """
+
+
+class CircuitOpen(RateUnavailable):
+    def __init__(self, retry_after, api_url=None):
+        """
+        Запрос не отправлен: предохранитель поставщика разомкнут после серии сбоев.
+        :retry_after: Через сколько секунд предохранитель пропустит пробный запрос.
+        :api_url: URL таблицы курсов.
+        """
+        super().__init__(f"{api_url or 'Поставщик курсов'} недоступен, повтор через {retry_after:.1f} с")
+        self.retry_after = retry_after
+        self.api_url = api_url
+
+
+class QuotaExhausted(RateUnavailable):
+    def __init__(self, retry_after, message=None):
+        """
+        Запрос к API не отправлен: ограничитель не выдал разрешения.
+        :retry_after: Через сколько секунд запрос может быть разрешён.
+        """
+        super().__init__(message or f"Квота запросов к API исчерпана, повтор через {retry_after:.1f} с")
+        self.retry_after = retry_after
+
+
+class UnknownCurrency(RateError, KeyError, ValueError):
+    def __init__(self, *currencies):
+        """
+        В таблице нет курса валюты или пары валют.
+        Наследует KeyError (поиск по таблице) и ValueError (ошибка ввода для интерфейсов).
+        :currencies: Код валюты или исходная и целевая валюты пары.
+        """
+        super().__init__(f"Нет курса для {'/'.join(map(str, currencies))}")
+        self.currencies = currencies
+
+    def __str__(self):
+        return self.args[0]  # KeyError заключил бы сообщение в кавычки
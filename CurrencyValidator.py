@@ -1,3 +1,7 @@
+# Валюты, доступные в интерфейсе (код -> название); единый список для окна, консоли и валидатора.
+SUPPORTED_CURRENCIES = {"USD": "доллар", "EUR": "евро", "GBP": "фунт стерлингов", "JPY": "иена", "RUB": "рубль"}
+
+
 # Класс для проверки корректности введенных данных
 class CurrencyValidator:
     def __init__(self, valid_currencies):
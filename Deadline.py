@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from CurrencyErrors import DeadlineExceeded
+
+
+class Deadline:
+    def __init__(self, timeout, clock=time.monotonic):
+        """
+        Абсолютный срок вызова: передаётся через конвертер, кэш и API, и каждый слой
+        ждёт не дольше оставшегося времени. Монотонные часы общие для всех потоков,
+        поэтому срок переживает переход в фоновый цикл событий.
+        :timeout: Через сколько секунд от текущего момента истекает срок.
+        :clock: Монотонные часы.
+        """
+        self.timeout = timeout
+        self.clock = clock
+        self.expires_at = clock() + timeout
+
+    @classmethod
+    def of(cls, value):
+        """
+        Срок из аргумента deadline: None, готовый Deadline или число секунд.
+        """
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(value)
+
+    def remaining(self):
+        """
+        Сколько секунд осталось (0, если срок истёк).
+        """
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self):
+        return self.clock() >= self.expires_at
+
+    def check(self, what="таблица курсов"):
+        """
+        :raises DeadlineExceeded: Срок уже истёк.
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"Срок {self.timeout:g} с истёк: {what} не получена")
+
+    def limit(self, timeout):
+        """
+        Таймаут операции с учётом срока: меньшее из timeout и оставшегося времени.
+        :timeout: Собственный таймаут операции (None - без ограничения).
+        """
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    async def wait(self, awaitable, what="таблица курсов"):
+        """
+        Ждёт awaitable не дольше оставшегося времени. По истечении срока awaitable отменяется,
+        поэтому общую загрузку нужно передавать обёрнутой в asyncio.shield.
+        :raises DeadlineExceeded: Срок истёк раньше, чем awaitable завершился.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f"Срок {self.timeout:g} с истёк: {what} не получена") from None
@@ -0,0 +1,113 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from LazyImport import LazyModule
+
+np = LazyModule("numpy")  # без NumPy используются целые числа Python (точно, но медленнее)
+
+# Число знаков после запятой в минимальных единицах валюты; остальные валюты - 2.
+CURRENCY_EXPONENTS = {"JPY": 0, "KRW": 0, "VND": 0, "CLP": 0, "ISK": 0}
+
+ROUNDING_MODES = ("half_even", "half_up", "down", "floor", "ceiling")
+
+
+class FixedPointEngine:
+    def __init__(self, exponents=None, rate_decimals=8, rounding="half_even"):
+        """
+        Точная конвертация сумм в минимальных единицах (центы, иены) целыми int64.
+        Курс хранится как целое, масштабированное на 10**rate_decimals, и уже
+        учитывает разницу в числе знаков у исходной и целевой валюты.
+        :exponents: Словарь {валюта: число знаков}, дополняет CURRENCY_EXPONENTS.
+        :rate_decimals: Точность масштабированного курса (знаков после запятой).
+        :rounding: Режим округления по умолчанию: half_even, half_up, down, floor, ceiling.
+        """
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"Неизвестный режим округления: {rounding}")
+        self.exponents = dict(CURRENCY_EXPONENTS, **(exponents or {}))
+        self.rate_decimals = rate_decimals
+        self.scale = 10 ** rate_decimals
+        self.rounding = rounding
+
+    def exponent(self, currency):
+        return self.exponents.get(currency, 2)
+
+    def scale_rate(self, rate, from_currency, to_currency):
+        """
+        Переводит курс в целое: минимальных единиц to_currency за одну минимальную единицу
+        from_currency, умноженное на 10**rate_decimals. Вычисляется через Decimal один раз на пару.
+        :rate: Курс (float, str или Decimal).
+        """
+        shift = self.exponent(to_currency) - self.exponent(from_currency)
+        scaled = Decimal(repr(rate) if isinstance(rate, float) else rate).scaleb(self.rate_decimals + shift)
+        return int(scaled.to_integral_value(ROUND_HALF_EVEN))
+
+    def to_minor(self, amounts, currency):
+        """
+        Суммы в основных единицах (float) -> целые минимальные единицы с округлением до ближайшего.
+        """
+        factor = 10 ** self.exponent(currency)
+        if np:
+            return np.rint(np.asarray(amounts, dtype=np.float64) * factor).astype(np.int64)
+        return [int(round(a * factor)) for a in amounts]
+
+    def from_minor(self, minor_amounts, currency):
+        """
+        Минимальные единицы -> основные единицы (float), для отображения.
+        """
+        factor = 10 ** self.exponent(currency)
+        if np:
+            return np.asarray(minor_amounts, dtype=np.int64) / factor
+        return [m / factor for m in minor_amounts]
+
+    def convert_minor(self, minor_amounts, scaled_rate, rounding=None):
+        """
+        Умножает суммы на масштабированный курс и округляет результат точно.
+        Промежуточное произведение не превышает int64: сумма и курс делятся
+        на старшие и младшие части по основанию 10**rate_decimals.
+        Переполнение возможно, только если сам результат не помещается в int64.
+        :minor_amounts: Целые суммы в минимальных единицах исходной валюты.
+        :scaled_rate: Курс из scale_rate (скаляр или массив той же длины).
+        :rounding: Режим округления (по умолчанию - заданный в конструкторе).
+        :return: Целые суммы в минимальных единицах целевой валюты.
+        """
+        rounding = rounding or self.rounding
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"Неизвестный режим округления: {rounding}")
+        if not np:
+            rates = scaled_rate if isinstance(scaled_rate, list) else [scaled_rate] * len(minor_amounts)
+            return [self._convert_one(int(a), int(r), rounding) for a, r in zip(minor_amounts, rates)]
+
+        amounts = np.asarray(minor_amounts, dtype=np.int64)
+        rate = np.asarray(scaled_rate, dtype=np.int64)
+        scale = self.scale
+        negative = (amounts < 0) != (rate < 0)
+        a, r = np.abs(amounts), np.abs(rate)
+
+        # |a| * |r| / S = a1*r + a0*r1 + a0*r0 / S, где a = a1*S + a0, r = r1*S + r0
+        a1, a0 = np.divmod(a, scale)
+        r1, r0 = np.divmod(r, scale)
+        low_quotient, remainder = np.divmod(a0 * r0, scale)
+        quotient = a1 * r + a0 * r1 + low_quotient
+
+        if rounding == "half_even":
+            twice = 2 * remainder
+            quotient += (twice > scale) | ((twice == scale) & (quotient % 2 == 1))
+        elif rounding == "half_up":
+            quotient += 2 * remainder >= scale
+        elif rounding == "floor":
+            quotient += negative & (remainder > 0)
+        elif rounding == "ceiling":
+            quotient += ~negative & (remainder > 0)
+        return np.where(negative, -quotient, quotient)
+
+    def _convert_one(self, amount, rate, rounding):
+        negative = (amount < 0) != (rate < 0)
+        quotient, remainder = divmod(abs(amount) * abs(rate), self.scale)
+        if rounding == "half_even":
+            quotient += 2 * remainder > self.scale or (2 * remainder == self.scale and quotient % 2 == 1)
+        elif rounding == "half_up":
+            quotient += 2 * remainder >= self.scale
+        elif rounding == "floor":
+            quotient += negative and remainder > 0
+        elif rounding == "ceiling":
+            quotient += not negative and remainder > 0
+        return -quotient if negative else quotient
@@ -0,0 +1,314 @@
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from datetime import date, datetime, time, timedelta
+
+from RateSnapshot import RateSnapshot
+
+# Заголовок файла: сигнатура, число строк, версия, число валют, базовая валюта.
+# Число строк лежит по выровненному смещению 8 и меняется последним при добавлении строки.
+HEADER = struct.Struct("<8sQII4s")
+HEADER_SIZE = 32
+ROWS = struct.Struct("<Q")
+MAGIC = b"RATEHIST"
+VERSION = 1
+CODE_SIZE = 4  # код валюты ASCII, дополненный нулями
+MIN_CAPACITY = 64  # строк, на которые файл расширяется как минимум
+
+
+def _epoch(at, end_of_day=True):
+    """
+    Момент времени -> секунды epoch.
+    Дата без времени (date или "2025-03-18") означает конец дня (курс на дату - последний
+    известный в этот день) или, для начала периода, его начало.
+    """
+    if isinstance(at, str):
+        at = date.fromisoformat(at) if len(at) == 10 else datetime.fromisoformat(at)
+    if not isinstance(at, datetime):
+        at = datetime.combine(at, time.max if end_of_day else time.min)
+    return at.timestamp()
+
+
+class HistoricalRateStore:
+    def __init__(self, path="rates_history.bin"):
+        """
+        История таблиц курсов в отображаемом в память (mmap) файле.
+        Одна строка на момент времени: время получения и по столбцу float64 на каждую валюту
+        (NaN - курса в этой таблице не было). Строки упорядочены по времени, поэтому поиск
+        курса на дату - двоичный поиск, O(log n), без чтения файла целиком.
+        Строка добавляется, только если курсы изменились: курс на любой момент -
+        последний известный до него.
+        Пишет один процесс; читатели в других процессах видят новые строки сразу.
+        :path: Путь к файлу истории (создаётся при первом добавлении).
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._map = None
+        self._file = None
+        self._inode = None
+        self.base = None
+        self.codes = ()
+        self.index = {}
+        if os.path.exists(path):
+            self._open()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return self._rows()
+
+    def append(self, snapshot):
+        """
+        Добавляет таблицу в историю.
+        Новые валюты добавляют столбцы (файл перезаписывается один раз на такое изменение).
+        :snapshot: Снимок таблицы курсов (RateSnapshot).
+        :return: True, если строка добавлена; False, если таблица не новее последней или курсы не изменились.
+        """
+        with self._lock:
+            self._refresh()
+            if self.base is not None and snapshot.base != self.base:
+                raise ValueError(f"История хранит курсы относительно {self.base}, а не {snapshot.base}")
+            timestamp = snapshot.timestamp.timestamp()
+            rows = self._rows()
+            new_codes = sorted(set(snapshot.rates).difference(self.codes))
+            if rows:
+                last = self._row(rows - 1)
+                if timestamp <= last[0]:
+                    return False
+                rates = snapshot.rates
+                if not new_codes and all(rates.get(code) == rate or (rate != rate and code not in rates)
+                                         for code, rate in zip(self.codes, last[1:])):
+                    return False  # курсы не изменились (например, ответ 304)
+
+            if self._map is None or new_codes:
+                self._rewrite(snapshot.base, self.codes + tuple(new_codes), self._scan_rows(0, rows))
+            if rows == self._capacity:
+                self._grow(max(self._capacity * 2, MIN_CAPACITY))
+
+            stride = len(self.codes) + 1
+            row = array("d", [timestamp])
+            row.extend(snapshot.rates.get(code, math.nan) for code in self.codes)
+            self._data[rows * stride:(rows + 1) * stride] = row
+            ROWS.pack_into(self._map, 8, rows + 1)  # читатели увидят строку только после записи данных
+            return True
+
+    def snapshot_at(self, at):
+        """
+        Таблица курсов, действовавшая в момент at.
+        :at: datetime, date или ISO-строка ("2025-03-18" - на конец дня).
+        :return: RateSnapshot или None, если история начинается позже.
+        """
+        with self._lock:
+            self._refresh()
+            i = self._bisect(_epoch(at)) - 1
+            if i < 0:
+                return None
+            return self._snapshot(self._row(i))
+
+    def get_rate(self, from_currency, to_currency, at):
+        """
+        Кросс-курс пары на момент at (как RateSnapshot.get_rate, без построения таблицы).
+        :return: Курс (float) или None, если на этот момент курса одной из валют нет.
+        """
+        with self._lock:
+            self._refresh()
+            i = self._bisect(_epoch(at)) - 1
+            f, t = self.index.get(from_currency), self.index.get(to_currency)
+            if i < 0 or f is None or t is None:
+                return None
+            offset = i * (len(self.codes) + 1) + 1
+            rate = self._data[offset + t] / self._data[offset + f]
+            return None if rate != rate else rate
+
+    def scan(self, start=None, end=None):
+        """
+        Таблицы курсов за период [start, end] по возрастанию времени.
+        :start: Начало периода (по умолчанию - начало истории).
+        :end: Конец периода (по умолчанию - конец истории).
+        :return: Список RateSnapshot.
+        """
+        with self._lock:
+            self._refresh()
+            first, last = self._bounds(start, end)
+            return [self._snapshot(row) for row in self._scan_rows(first, last)]
+
+    def series(self, from_currency, to_currency, start=None, end=None):
+        """
+        Ряд кросс-курса пары за период [start, end].
+        :return: Список пар (datetime, курс); моменты без курса одной из валют пропускаются.
+        """
+        with self._lock:
+            self._refresh()
+            f, t = self.index.get(from_currency), self.index.get(to_currency)
+            if f is None or t is None:
+                return []
+            first, last = self._bounds(start, end)
+            result = []
+            for row in self._scan_rows(first, last):
+                rate = row[t + 1] / row[f + 1]
+                if rate == rate:
+                    result.append((datetime.fromtimestamp(row[0]), rate))
+            return result
+
+    def compact(self, max_age=None, downsample_after=None, interval=timedelta(days=1), now=None):
+        """
+        Сокращает историю: удаляет старые строки и прореживает давние.
+        :max_age: Строки старше (timedelta) удаляются; None - хранить всё.
+        :downsample_after: Строки старше (timedelta) прореживаются до одной (последней) на interval;
+                           курс на дату в прореженном периоде - курс на конец интервала.
+        :interval: Шаг прореживания (по умолчанию - сутки).
+        :now: Момент отсчёта сроков (по умолчанию - текущий).
+        :return: Число удалённых строк.
+        """
+        with self._lock:
+            self._refresh()
+            if self._map is None:
+                return 0
+            now = (now or datetime.now()).timestamp()
+            oldest = now - max_age.total_seconds() if max_age is not None else -math.inf
+            coarse_before = now - downsample_after.total_seconds() if downsample_after is not None else -math.inf
+            step = interval.total_seconds()
+
+            kept = []
+            rows = self._scan_rows(0, self._rows())
+            for i, row in enumerate(rows):
+                if row[0] < oldest:
+                    continue
+                if row[0] < coarse_before and i + 1 < len(rows) and rows[i + 1][0] < coarse_before \
+                        and _bucket(row[0], step) == _bucket(rows[i + 1][0], step):
+                    continue  # в интервале есть более поздняя строка
+                kept.append(row)
+            removed = len(rows) - len(kept)
+            if removed:
+                self._rewrite(self.base, self.codes, kept)
+            return removed
+
+    def flush(self):
+        """
+        Сбрасывает изменённые страницы файла на диск.
+        """
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self):
+        """
+        Закрывает файл, отрезая неиспользованный запас строк.
+        """
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            size = _data_offset(len(self.codes)) + self._rows() * (len(self.codes) + 1) * 8
+            self._close()
+            os.truncate(self.path, size)
+
+    def _rows(self):
+        return ROWS.unpack_from(self._map, 8)[0] if self._map is not None else 0
+
+    def _row(self, i):
+        stride = len(self.codes) + 1
+        return self._data[i * stride:(i + 1) * stride].tolist()
+
+    def _scan_rows(self, first, last):
+        if self._map is None:
+            return []
+        stride = len(self.codes) + 1
+        values = self._data[first * stride:last * stride].tolist()
+        return [values[i:i + stride] for i in range(0, len(values), stride)]
+
+    def _snapshot(self, row):
+        rates = {code: rate for code, rate in zip(self.codes, row[1:]) if rate == rate}
+        return RateSnapshot(self.base, rates, datetime.fromtimestamp(row[0]))
+
+    def _bisect(self, timestamp, inclusive=True):
+        # Двоичный поиск по столбцу времени: число строк со временем <= timestamp (< при inclusive=False).
+        if self._map is None:
+            return 0
+        data, stride = self._data, len(self.codes) + 1
+        lo, hi = 0, self._rows()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = data[mid * stride]
+            if value < timestamp or inclusive and value == timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _bounds(self, start, end):
+        first = self._bisect(_epoch(start, end_of_day=False), inclusive=False) if start is not None else 0
+        last = self._bisect(_epoch(end)) if end is not None else self._rows()
+        return first, max(first, last)
+
+    def _open(self):
+        self._file = open(self.path, "r+b")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, _, version, count, base = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._close()
+            raise ValueError(f"{self.path}: не файл истории курсов")
+        self.base = base.rstrip(b"\0").decode("ascii")
+        self.codes = tuple(self._map[HEADER_SIZE + i * CODE_SIZE:HEADER_SIZE + (i + 1) * CODE_SIZE]
+                           .rstrip(b"\0").decode("ascii") for i in range(count))
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        offset = _data_offset(count)
+        stride = count + 1
+        self._capacity = (len(self._map) - offset) // (stride * 8)
+        self._data = memoryview(self._map)[offset:offset + self._capacity * stride * 8].cast("d")
+
+    def _close(self):
+        if self._map is not None:
+            self._data.release()
+            self._map.close()
+            self._file.close()
+        self._map = self._file = self._data = None
+
+    def _refresh(self):
+        # Другой процесс мог перезаписать файл (новые валюты, compact) или расширить его.
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._inode or (self._map is not None and self._rows() > self._capacity):
+            self._close()
+            self._open()
+
+    def _grow(self, capacity):
+        size = _data_offset(len(self.codes)) + capacity * (len(self.codes) + 1) * 8
+        self._close()
+        os.truncate(self.path, size)
+        self._open()
+
+    def _rewrite(self, base, codes, rows):
+        # Новый файл пишется рядом и атомарно заменяет старый: читатели не видят половину записи.
+        stride = len(codes) + 1
+        old_index = self.index
+        capacity = max(len(rows), MIN_CAPACITY)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(rows), VERSION, len(codes), base.encode("ascii")).ljust(HEADER_SIZE, b"\0"))
+            f.write(b"".join(code.encode("ascii").ljust(CODE_SIZE, b"\0") for code in codes)
+                    .ljust(_data_offset(len(codes)) - HEADER_SIZE, b"\0"))
+            for row in rows:
+                values = array("d", [row[0]])
+                values.extend(row[old_index[code] + 1] if code in old_index else math.nan for code in codes)
+                f.write(values.tobytes())
+            f.truncate(_data_offset(len(codes)) + capacity * stride * 8)
+        self._close()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+
+def _data_offset(count):
+    return (HEADER_SIZE + count * CODE_SIZE + 7) // 8 * 8
+
+
+def _bucket(timestamp, step):
+    # Интервалы прореживания отсчитываются по местному времени, чтобы сутки совпадали с календарными.
+    offset = datetime.fromtimestamp(timestamp).astimezone().utcoffset().total_seconds()
+    return int((timestamp + offset) // step)
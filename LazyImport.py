@@ -0,0 +1,45 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    def __init__(self, name):
+        """
+        Модуль, который импортируется при первом обращении к нему.
+        Тяжёлые зависимости (NumPy, aiohttp) не замедляют запуск программ,
+        которым они не нужны.
+        :name: Имя модуля для importlib.import_module.
+        """
+        self._name = name
+        self._module = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except ImportError:  # модуль необязателен: вызывающий проверяет bool(...)
+                        self._module = None
+                    self._loaded = True
+        return self._module
+
+    def __bool__(self):
+        """
+        True, если модуль установлен (при первой проверке импортирует его).
+        """
+        return self._load() is not None
+
+    def __getattr__(self, attr):
+        module = self._load()
+        if module is None:
+            raise ImportError(f"Модуль {self._name} не установлен")
+        value = getattr(module, attr)
+        setattr(self, attr, value)  # следующие обращения обходят __getattr__
+        return value
+
+    def __repr__(self):
+        state = "загружен" if self._loaded else "не загружен"
+        return f"<LazyModule {self._name} ({state})>"
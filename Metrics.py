@@ -0,0 +1,147 @@
+import threading
+from bisect import bisect_left
+
+# Границы корзин гистограмм по умолчанию: задержки в секундах.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Границы корзин для размеров ответов в байтах.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя корзина - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        """
+        Счётчики, показатели (gauge) и гистограммы этапов конвертации.
+        Пока enabled равен False, инструментированный код ничего не измеряет:
+        стоимость сводится к проверке одного атрибута.
+        :enabled: Включить сбор метрик сразу.
+        """
+        self.enabled = enabled
+        self._counters = {}  # (name, labels) -> value
+        self._gauges = {}  # (name, labels) -> последнее значение
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def inc(self, name, value=1, **labels):
+        """
+        Увеличивает счётчик.
+        :name: Имя метрики.
+        :value: Приращение.
+        :labels: Метки, например pair="USD_EUR".
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """
+        Устанавливает показатель, который может как расти, так и убывать (например, остаток квоты).
+        :name: Имя метрики.
+        :value: Текущее значение.
+        :labels: Метки, например api="exchangerate-api".
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """
+        Добавляет наблюдение в гистограмму.
+        :name: Имя метрики.
+        :value: Значение (секунды для задержек, байты для размеров).
+        :buckets: Границы корзин, используются при первом наблюдении.
+        :labels: Метки, например stage="cache".
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Текущие значения всех метрик.
+        :return: {"counters": {...}, "gauges": {...}, "histograms": {...}},
+                 ключи - (имя, ((метка, значение), ...)).
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: {"buckets": h.buckets, "counts": list(h.counts), "sum": h.sum, "count": h.count}
+                               for key, h in self._histograms.items()},
+            }
+
+    def cache_hit_ratio(self):
+        """
+        Доля попаданий в кэш курсов (None, если обращений не было).
+        """
+        counters = self.snapshot()["counters"]
+        hits = counters.get(("currency_cache_requests_total", (("result", "hit"),)), 0)
+        misses = counters.get(("currency_cache_requests_total", (("result", "miss"),)), 0)
+        return hits / (hits + misses) if hits + misses else None
+
+    def render_prometheus(self):
+        """
+        Метрики в текстовом формате Prometheus.
+        """
+        data = self.snapshot()
+        lines = []
+        for name in sorted({key[0] for key in data["counters"]}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(data["counters"].items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        for name in sorted({key[0] for key in data["gauges"]}):
+            lines.append(f"# TYPE {name} gauge")
+            for (metric, labels), value in sorted(data["gauges"].items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        for name in sorted({key[0] for key in data["histograms"]}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), h in sorted(data["histograms"].items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(h["buckets"] + (float("inf"),), h["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {h['sum']}")
+                lines.append(f"{name}_count{_labels(labels)} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# Общий реестр процесса; по умолчанию выключен.
+metrics = MetricsRegistry()
@@ -0,0 +1,38 @@
+from AsyncProviderPool import AsyncProviderPool
+from AsyncRunner import run_sync
+from Deadline import Deadline
+
+
+class ProviderPool:
+    def __init__(self, providers, **options):
+        """
+        Синхронная обёртка над AsyncProviderPool; подставляется везде, где ожидается CurrencyAPI.
+        :providers: URL или объекты CurrencyAPI / AsyncCurrencyAPI поставщиков курсов.
+        :options: Параметры AsyncProviderPool (hedge_percentile, max_parallel, ...) и AsyncCurrencyAPI.
+        """
+        self.async_api = AsyncProviderPool([getattr(p, "async_api", p) for p in providers], **options)
+        self.api_url = self.async_api.api_url
+
+    @property
+    def stats(self):
+        """
+        Счётчики запросов, дублирующих запросов и переключений на запасного поставщика.
+        """
+        return self.async_api.stats
+
+    def provider_stats(self):
+        return self.async_api.provider_stats()
+
+    def get_snapshot(self, deadline=None):
+        """
+        Загружает таблицу курсов у самого быстрого ответившего поставщика.
+        :deadline: Срок вызова (Deadline или секунды).
+        :return: RateSnapshot или None, если ни один поставщик не вернул таблицу.
+        """
+        return run_sync(self.async_api.get_snapshot(Deadline.of(deadline)))
+
+    def get_exchange_rate(self, from_currency, to_currency, deadline=None):
+        return run_sync(self.async_api.get_exchange_rate(from_currency, to_currency, Deadline.of(deadline)))
+
+    def close(self):
+        run_sync(self.async_api.close())
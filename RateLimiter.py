@@ -0,0 +1,136 @@
+import threading
+import time
+
+from Metrics import metrics
+
+SECONDS_PER_DAY = 86400
+
+
+class QuotaLimiter:
+    def __init__(self, rate=1.0, burst=1, daily_quota=None, tight_ratio=0.2, name="default",
+                 clock=time.monotonic, wall_clock=time.time):
+        """
+        Клиентский ограничитель запросов к API курсов: ведро токенов и суточная квота.
+        Ведро пополняется на rate токенов в секунду и вмещает не больше burst, поэтому подряд
+        уходит не больше burst запросов. Квота daily_quota сбрасывается в полночь UTC.
+        :rate: Средняя допустимая частота запросов в секунду.
+        :burst: Сколько запросов можно отправить подряд без ожидания.
+        :daily_quota: Запросов в сутки (None - без суточного ограничения).
+        :tight_ratio: Квота считается напряжённой, если её остаток меньше (1 - tight_ratio)
+                      доли, положенной на оставшуюся часть суток при равномерном расходе.
+        :name: Метка api в метриках.
+        :clock: Монотонные часы для ведра токенов.
+        :wall_clock: Часы UTC (секунды epoch) для суточной квоты.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.daily_quota = daily_quota
+        self.tight_ratio = tight_ratio
+        self.name = name
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.stats = {"granted": 0, "denied": 0}
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._day = None
+        self._used = 0
+        self._next_slot = 0.0
+
+    @property
+    def remaining(self):
+        """
+        Остаток суточной квоты (None без суточного ограничения).
+        """
+        with self._lock:
+            self._roll_day()
+            return None if self.daily_quota is None else max(self.daily_quota - self._used, 0)
+
+    def try_acquire(self):
+        """
+        Забирает разрешение на один запрос.
+        :return: True, если запрос можно отправить; False, если ведро пусто или квота исчерпана.
+        """
+        with self._lock:
+            self._refill()
+            self._roll_day()
+            granted = self._tokens >= 1 and (self.daily_quota is None or self._used < self.daily_quota)
+            if granted:
+                self._tokens -= 1
+                self._used += 1
+            self.stats["granted" if granted else "denied"] += 1
+            remaining = None if self.daily_quota is None else self.daily_quota - self._used
+        if metrics.enabled:
+            metrics.inc("currency_api_quota_requests_total", api=self.name, result="granted" if granted else "denied")
+            if remaining is not None:
+                metrics.set("currency_api_quota_remaining", remaining, api=self.name)
+        return granted
+
+    def retry_after(self):
+        """
+        Через сколько секунд try_acquire может вернуть True.
+        """
+        with self._lock:
+            self._refill()
+            self._roll_day()
+            if self.daily_quota is not None and self._used >= self.daily_quota:
+                return self._seconds_to_reset()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def is_tight(self):
+        """
+        Квота расходуется быстрее, чем позволяет равномерный расход до конца суток.
+        """
+        with self._lock:
+            self._roll_day()
+            return self._is_tight()
+
+    def pace_interval(self):
+        """
+        Интервал между запросами, при котором остатка квоты хватит до её сброса.
+        """
+        with self._lock:
+            self._roll_day()
+            return self._pace_interval()
+
+    def schedule(self, delay):
+        """
+        Резервирует время для фонового обновления не раньше чем через delay секунд.
+        Обновления, запланированные через один ограничитель, разносятся не чаще чем раз в 1/rate
+        секунд (а при напряжённой квоте - раз в pace_interval), а не уходят пачкой в момент истечения.
+        :delay: Желаемая задержка в секундах.
+        :return: Задержка, через которую обновление получит своё окно.
+        """
+        with self._lock:
+            self._roll_day()
+            now = self.clock()
+            interval = self._pace_interval() if self._is_tight() else 1 / self.rate
+            slot = max(now + delay, self._next_slot)
+            self._next_slot = slot + interval
+            return slot - now
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _roll_day(self):
+        day = int(self.wall_clock() // SECONDS_PER_DAY)
+        if day != self._day:
+            self._day = day
+            self._used = 0
+
+    def _seconds_to_reset(self):
+        return SECONDS_PER_DAY - self.wall_clock() % SECONDS_PER_DAY
+
+    def _is_tight(self):
+        if self.daily_quota is None:
+            return False
+        day_left = self._seconds_to_reset() / SECONDS_PER_DAY
+        return self.daily_quota - self._used < self.daily_quota * day_left * (1 - self.tight_ratio)
+
+    def _pace_interval(self):
+        if self.daily_quota is None:
+            return 1 / self.rate
+        remaining = self.daily_quota - self._used
+        return max(self._seconds_to_reset() / max(remaining, 1), 1 / self.rate)
@@ -0,0 +1,219 @@
+import math
+import threading
+from array import array
+
+from CurrencyErrors import UnknownCurrency
+from LazyImport import LazyModule
+
+np = LazyModule("numpy")  # без NumPy матрица хранится и обновляется на array('d')
+
+
+class RateMatrix:
+    def __init__(self, snapshot=None):
+        """
+        Плотная матрица кросс-курсов N×N с целочисленными ID валют.
+        Код валюты один раз сопоставляется с ID (ids), после чего курс любой пары,
+        включая обратный, - это чтение ячейки matrix[from_id][to_id] без деления и хеширования строк пар.
+        Ячейки хранятся в одном array('d'); с NumPy к нему открыт вид (N, N) без копирования
+        для векторных выборок и обновлений.
+        :snapshot: Необязательный RateSnapshot для начального построения.
+        """
+        self.base = None
+        self.codes = ()  # ID -> код валюты
+        self.ids = {}  # код валюты -> ID
+        self.stats = {"full_rebuilds": 0, "partial_updates": 0, "cells_updated": 0}
+        self._lock = threading.Lock()
+        self._rates = array("d")  # ID -> курс относительно базовой валюты (NaN - нет курса)
+        self._cells = array("d")  # по строкам: _cells[i * N + j] - курс из валюты i в валюту j
+        self._view = None
+        # Читатели берут ids, ячейки и ключи поиска из одного кортежа: перестроение подменяет его целиком.
+        self._layout = (self.ids, self._cells, self._view, None)
+        if snapshot is not None:
+            self.update(snapshot)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def update(self, snapshot):
+        """
+        Приводит матрицу к таблице snapshot.
+        Если набор валют не изменился, пересчитываются только строки и столбцы изменившихся курсов;
+        новые валюты или другая базовая валюта приводят к полному построению.
+        :snapshot: Снимок таблицы курсов (RateSnapshot).
+        :return: Число валют, курсы которых изменились.
+        """
+        with self._lock:
+            # Читатели без блокировки: матрица никогда не меняется на месте, новая раскладка
+            # (ids, ячейки, вид, ключи) строится отдельно и подменяет старую одним присваиванием.
+            rates = snapshot.rates
+            if snapshot.base != self.base or any(code not in self.ids for code in rates):
+                self._rebuild(snapshot.base, rates)
+                return len(self.codes)
+            changed = [i for i, code in enumerate(self.codes) if not _same(_rate(rates, code), self._rates[i])]
+            if not changed:
+                return 0
+            if len(changed) * 2 > len(self.codes):
+                self._rebuild(snapshot.base, rates)  # построение целиком дешевле построчного
+            else:
+                values = array("d", self._rates)
+                for i in changed:
+                    values[i] = _rate(rates, self.codes[i])
+                self._update_cells(values, changed)
+                self.stats["partial_updates"] += 1
+            return len(changed)
+
+    def id_of(self, currency):
+        """
+        ID валюты; UnknownCurrency (KeyError), если валюты нет в матрице.
+        """
+        return _id_of(self._layout[0], currency)
+
+    def get_rate(self, from_currency, to_currency):
+        """
+        Кросс-курс пары (как RateSnapshot.get_rate). Для одной пары RateSnapshot.get_rate
+        примерно вдвое быстрее (два поиска в словаре и деление против разбора кортежа раскладки),
+        поэтому CurrencyConverter берёт одиночные курсы из таблицы, а матрицу - для массивов.
+        :return: Курс (float) или None, если валюты нет в таблице.
+        """
+        ids, cells, _, _ = self._layout
+        try:
+            rate = cells[ids[from_currency] * len(ids) + ids[to_currency]]
+        except KeyError:
+            return None
+        return None if rate != rate else rate
+
+    def get_rates(self, from_currency, to_currency):
+        """
+        Векторная выборка курсов: коды (строка или массив) переводятся в ID
+        один раз на различный код, курсы берутся из матрицы одним индексированием.
+        :from_currency: Код исходной валюты или массив кодов.
+        :to_currency: Код целевой валюты или массив кодов той же формы.
+        :return: numpy.ndarray float64 формы входных массивов (list без NumPy).
+        :raises UnknownCurrency: Валюты нет в матрице или её нет в текущей таблице (ячейка NaN),
+                                 как у RateSnapshot.get_rate.
+        """
+        layout = self._layout
+        ids, cells, view, _ = layout
+        if not np:
+            n = len(ids)
+            count = max(1 if isinstance(codes, str) else len(codes) for codes in (from_currency, to_currency))
+            from_ids = _ids_of(layout, [from_currency] * count if isinstance(from_currency, str) else from_currency)
+            to_ids = _ids_of(layout, [to_currency] * count if isinstance(to_currency, str) else to_currency)
+            rates = [cells[i * n + j] for i, j in zip(from_ids, to_ids)]
+            for i, j, rate in zip(from_ids, to_ids, rates):
+                if rate != rate:
+                    raise UnknownCurrency(self.codes[i], self.codes[j])
+            return rates
+        from_codes, to_codes = np.broadcast_arrays(np.asarray(from_currency), np.asarray(to_currency))
+        from_ids, to_ids = _ids_of(layout, from_codes), _ids_of(layout, to_codes)
+        rates = view[from_ids, to_ids]
+        missing = np.isnan(rates)
+        if missing.any():
+            # Валюта выпала из таблицы, но осталась в раскладке матрицы.
+            k = np.flatnonzero(missing)[0]
+            raise UnknownCurrency(str(from_codes.reshape(-1)[k]), str(to_codes.reshape(-1)[k]))
+        return rates
+
+    def ids_of(self, codes):
+        """
+        Массив кодов -> массив ID той же формы (поиск в словаре - один раз на различный код).
+        """
+        return _ids_of(self._layout, codes)
+
+    @property
+    def matrix(self):
+        """
+        Матрица (N, N) как numpy.ndarray без копирования (None без NumPy).
+        """
+        return self._view
+
+    def _rebuild(self, base, rates):
+        codes = tuple(sorted(rates))
+        values = array("d", (_rate(rates, code) for code in codes))
+        n = len(codes)
+        if np:
+            r = np.frombuffer(values, dtype=np.float64) if n else np.empty(0)
+            cells = array("d", bytes(8 * n * n))
+            view = np.frombuffer(cells, dtype=np.float64).reshape(n, n) if n else np.empty((0, 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.divide(r[None, :], r[:, None], out=view)
+        else:
+            cells = array("d", (_divide(values[j], values[i]) for i in range(n) for j in range(n)))
+            view = None
+        ids = {code: i for i, code in enumerate(codes)}
+        # ID совпадает с позицией кода в отсортированном списке, поэтому массив кодов
+        # переводится в ID двоичным поиском по целочисленным ключам, без хеширования строк.
+        keys = _code_keys(np.array(codes, dtype="U3")) if np and all(len(code) <= 3 for code in codes) else None
+        self._layout = (ids, cells, view, keys)
+        self.base, self.codes, self.ids, self._rates, self._cells, self._view = base, codes, ids, values, cells, view
+        self.stats["full_rebuilds"] += 1
+        self.stats["cells_updated"] += n * n
+
+    def _update_cells(self, values, changed):
+        # Изменился курс валюты k: пересчитываются строка k (из k во все) и столбец k (из всех в k).
+        # Правка идёт в копии ячеек: читатель, взявший старую раскладку, видит одну таблицу целиком.
+        n, cells = len(self.codes), array("d", self._cells)
+        if np:
+            r = np.frombuffer(values, dtype=np.float64)
+            view = np.frombuffer(cells, dtype=np.float64).reshape(n, n)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                view[changed, :] = r[None, :] / r[changed, None]
+                view[:, changed] = r[None, changed] / r[:, None]
+        else:
+            view = None
+            for k in changed:
+                for j in range(n):
+                    cells[k * n + j] = _divide(values[j], values[k])
+                    cells[j * n + k] = _divide(values[k], values[j])
+        ids, _, _, keys = self._layout
+        self._layout = (ids, cells, view, keys)
+        self._rates, self._cells, self._view = values, cells, view
+        self.stats["cells_updated"] += len(changed) * (2 * n - len(changed))
+
+
+def _id_of(ids, currency):
+    try:
+        return ids[currency]
+    except KeyError:
+        raise UnknownCurrency(currency) from None
+
+
+def _ids_of(layout, codes):
+    ids, _, _, keys = layout
+    if not np:
+        return [_id_of(ids, code) for code in codes]
+    codes = np.asarray(codes)
+    if keys is not None and codes.dtype.kind == "U" and codes.dtype.itemsize <= 12 and len(keys):
+        wanted = _code_keys(codes)
+        found = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        unknown = keys[found] != wanted
+        if unknown.any():
+            _id_of(ids, str(codes[unknown][0]))  # UnknownCurrency с кодом валюты
+        return found
+    unique, inverse = np.unique(codes, return_inverse=True)
+    unique_ids = np.fromiter((_id_of(ids, str(code)) for code in unique), dtype=np.intp, count=len(unique))
+    return unique_ids[inverse].reshape(codes.shape)
+
+
+def _code_keys(codes):
+    # Код из не более чем трёх символов -> int64 (по 21 бит на символ); порядок ключей совпадает со строковым.
+    chars = np.ascontiguousarray(codes).view(np.uint32).reshape(codes.shape + (codes.dtype.itemsize // 4,))
+    keys = np.zeros(codes.shape, dtype=np.int64)
+    for i in range(3):
+        keys <<= 21
+        if i < chars.shape[-1]:
+            keys |= chars[..., i]
+    return keys
+
+
+def _rate(rates, code):
+    rate = rates.get(code)
+    return math.nan if rate is None else float(rate)
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def _divide(a, b):
+    return a / b if b else math.nan
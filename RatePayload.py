@@ -0,0 +1,70 @@
+import json
+import zlib
+
+from LazyImport import LazyModule
+from RateSnapshot import RateSnapshot
+
+# Необязательные ускорители: orjson разбирает таблицу в несколько раз быстрее json,
+# brotli добавляет сжатие br. Без них используются стандартные json и zlib.
+orjson = LazyModule("orjson")
+brotli = LazyModule("brotli")
+
+
+def accept_encoding():
+    """
+    Значение Accept-Encoding: только те сжатия, которые decompress умеет распаковать.
+    """
+    return "gzip, deflate, br" if brotli else "gzip, deflate"
+
+
+def decompress(body, encoding):
+    """
+    Распаковывает тело ответа по Content-Encoding.
+    :body: Тело ответа (bytes) в том виде, в каком пришло по сети.
+    :encoding: Значение Content-Encoding (None или "identity" - без сжатия).
+    :raises ValueError: Сжатие не поддерживается или данные повреждены.
+    """
+    if not encoding or encoding == "identity":
+        return body
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        try:
+            return zlib.decompress(body, zlib.MAX_WBITS | 32)  # заголовок gzip или zlib определяется сам
+        except zlib.error as e:
+            if encoding == "deflate":
+                try:
+                    return zlib.decompress(body, -zlib.MAX_WBITS)  # deflate без заголовка zlib
+                except zlib.error:
+                    pass
+            raise ValueError(f"Повреждённый ответ ({encoding}): {e}") from e
+    if encoding == "br" and brotli:
+        try:
+            return brotli.decompress(body)
+        except brotli.error as e:
+            raise ValueError(f"Повреждённый ответ (br): {e}") from e
+    raise ValueError(f"Неподдерживаемое сжатие ответа: {encoding}")
+
+
+def loads(body):
+    """
+    Разбирает JSON: orjson, если установлен, иначе стандартный json.
+    """
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def parse_snapshot(body, loads=loads):
+    """
+    Таблица курсов из тела ответа API ({"base": ..., "rates": {...}}).
+    Словарь rates, построенный декодером, становится RateSnapshot.rates без копирования;
+    orjson к тому же кэширует короткие ключи, и коды валют разделяются между обновлениями.
+    :body: Распакованное тело ответа (bytes).
+    :loads: Функция разбора JSON (для сравнения декодеров в бенчмарках).
+    :raises ValueError: Некорректный JSON или таблица без base / rates.
+    """
+    data = loads(body)
+    try:
+        base, rates = data["base"], data["rates"]
+    except (KeyError, TypeError):
+        raise ValueError("В ответе нет base или rates") from None
+    if not isinstance(rates, dict):
+        raise ValueError("rates должен быть объектом JSON")
+    return RateSnapshot(base, rates)
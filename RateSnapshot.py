@@ -0,0 +1,41 @@
+from datetime import datetime
+
+
+class RateSnapshot:
+    def __init__(self, base, rates, timestamp=None):
+        """
+        Снимок таблицы курсов, полученной за один запрос к API.
+        :base: Базовая валюта таблицы (например, "USD").
+        :rates: Словарь курсов валют относительно базовой.
+        :timestamp: Время получения таблицы (по умолчанию - текущее).
+        """
+        self.base = base
+        self.rates = rates
+        self.timestamp = timestamp or datetime.now()
+
+    def get_rate(self, from_currency, to_currency):
+        """
+        Кросс-курс для любой пары валют из таблицы.
+        :from_currency: Исходная валюта.
+        :to_currency: Целевая валюта.
+        :return: Курс (float) или None, если валюты нет в таблице.
+        """
+        rates = self.rates
+        try:
+            return rates[to_currency] / rates[from_currency]
+        except KeyError:
+            return None
+
+    def is_fresh(self, duration):
+        """
+        Проверяет, не устарел ли снимок.
+        :duration: Срок актуальности (timedelta).
+        """
+        return datetime.now() - self.timestamp < duration
+
+    def renewed(self):
+        """
+        Копия снимка с теми же курсами и новым временем получения.
+        Используется, когда сервер подтвердил, что таблица не изменилась (304).
+        """
+        return RateSnapshot(self.base, self.rates)
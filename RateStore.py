@@ -0,0 +1,56 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from RateSnapshot import RateSnapshot
+
+
+class SQLiteRateStore:
+    def __init__(self, path="rates_cache.sqlite3"):
+        """
+        Постоянное хранилище таблиц курсов в SQLite.
+        Каждая запись - одна транзакция, поэтому файл можно безопасно
+        использовать из нескольких процессов на одной машине.
+        :path: Путь к файлу базы данных.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "api_url TEXT PRIMARY KEY, base TEXT, fetched_at REAL NOT NULL, rates TEXT NOT NULL)")
+
+    def load(self, api_url):
+        """
+        Загружает последнюю сохранённую таблицу.
+        :api_url: URL API, от которого получена таблица.
+        :return: RateSnapshot или None, если записи нет.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT base, fetched_at, rates FROM snapshots WHERE api_url = ?", (api_url,)).fetchone()
+        if row is None:
+            return None
+        base, fetched_at, rates = row
+        return RateSnapshot(base, json.loads(rates), datetime.fromtimestamp(fetched_at))
+
+    def save(self, api_url, snapshot):
+        """
+        Атомарно сохраняет таблицу. Более старый снимок не перезаписывает
+        более новый, записанный другим процессом.
+        :api_url: URL API, от которого получена таблица.
+        :snapshot: Снимок таблицы курсов (RateSnapshot).
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO snapshots (api_url, base, fetched_at, rates) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(api_url) DO UPDATE SET base = excluded.base, fetched_at = excluded.fetched_at, "
+                "rates = excluded.rates WHERE excluded.fetched_at > snapshots.fetched_at",
+                (api_url, snapshot.base, snapshot.timestamp.timestamp(), json.dumps(snapshot.rates)))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
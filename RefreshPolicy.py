@@ -0,0 +1,37 @@
+import random
+
+
+class RefreshPolicy:
+    def __init__(self, soft_ttl=3000.0, hard_ttl=3600.0, jitter=0.1, retry_base=1.0, retry_max=60.0):
+        """
+        Параметры режима stale-while-revalidate.
+        :soft_ttl: Возраст таблицы в секундах, после которого она обновляется в фоне,
+                   а запросы продолжают получать текущую таблицу без ожидания.
+        :hard_ttl: Возраст таблицы в секундах, после которого она больше не отдаётся
+                   и запрос ждёт загрузки.
+        :jitter: Доля случайного разброса момента фонового обновления (0.1 = ±10%).
+        :retry_base: Задержка первого повтора после неудачного обновления в секундах.
+        :retry_max: Максимальная задержка повтора в секундах.
+        """
+        if not 0 < soft_ttl < hard_ttl:
+            raise ValueError("soft_ttl должен быть положительным и меньше hard_ttl")
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+    def refresh_delay(self):
+        """
+        Через сколько секунд после загрузки таблицу пора обновить в фоне.
+        Разброс не даёт нескольким процессам обновляться одновременно.
+        """
+        delay = self.soft_ttl * (1 + random.uniform(-self.jitter, self.jitter))
+        return min(delay, self.hard_ttl)
+
+    def retry_delay(self, attempt):
+        """
+        Экспоненциальная задержка перед повтором неудачного обновления.
+        :attempt: Номер неудачной попытки, начиная с 0.
+        """
+        return min(self.retry_max, self.retry_base * 2 ** attempt)
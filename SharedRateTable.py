@@ -0,0 +1,249 @@
+import struct
+import time
+from datetime import datetime, timedelta
+from multiprocessing import resource_tracker, shared_memory
+
+from ConverterLogging import logger
+from CurrencyErrors import RateUnavailable
+from RateSnapshot import RateSnapshot
+
+# Заголовок блока: seqlock-счётчик, число валют, время публикации (секунды epoch), базовая валюта.
+HEADER = struct.Struct("<QQd4s")
+CODE_SIZE = 4  # код валюты ASCII, дополненный нулями
+
+
+def _attach_untracked(name):
+    # Читатель не должен регистрировать блок в трекере ресурсов: иначе трекер
+    # процесса-читателя удалит блок при его выходе. В Python 3.13+ для этого есть track=False.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedRateTable:
+    def __init__(self, shm, owner):
+        """
+        Таблица курсов в блоке multiprocessing.shared_memory фиксированной раскладки:
+        заголовок, коды валют, массив float64 курсов (по индексу валюты).
+        Один процесс публикует (publish), остальные читают без блокировок и копирования:
+        seqlock-счётчик нечётен во время записи, читатель повторяет чтение, если он изменился.
+        Создавать через SharedRateTable.create (публикатор) или SharedRateTable.attach (читатели).
+        """
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        self._header = buf[:8].cast("Q")  # seqlock-счётчик
+        self._published_at = buf[16:24].cast("d")  # время публикации из заголовка
+        _, count, _, _ = HEADER.unpack_from(buf, 0)
+        codes_end = HEADER.size + count * CODE_SIZE
+        self.codes = tuple(bytes(buf[HEADER.size + i * CODE_SIZE:HEADER.size + (i + 1) * CODE_SIZE])
+                           .rstrip(b"\0").decode("ascii") for i in range(count))
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        rates_offset = (codes_end + 7) // 8 * 8
+        self._rates = buf[rates_offset:rates_offset + count * 8].cast("d")
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, codes, name=None):
+        """
+        Создаёт блок для заданного набора валют (раскладка после создания не меняется).
+        :codes: Коды валют, например ("USD", "EUR", ...).
+        :name: Имя блока (по умолчанию - сгенерированное).
+        """
+        codes = tuple(codes)
+        codes_end = HEADER.size + len(codes) * CODE_SIZE
+        size = (codes_end + 7) // 8 * 8 + len(codes) * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, 0, len(codes), 0.0, b"")
+        for i, code in enumerate(codes):
+            struct.pack_into("4s", shm.buf, HEADER.size + i * CODE_SIZE, code.encode("ascii"))
+        table = cls(shm, owner=True)
+        for i in range(len(codes)):
+            table._rates[i] = float("nan")
+        return table
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Подключается к существующему блоку по имени.
+        """
+        return cls(_attach_untracked(name), owner=False)
+
+    def publish(self, snapshot):
+        """
+        Записывает таблицу курсов. Должен вызываться только одним процессом.
+        Валюты, которых нет в раскладке, пропускаются; отсутствующие в снимке получают NaN.
+        :snapshot: RateSnapshot.
+        """
+        rates = snapshot.rates
+        self._header[0] += 1  # нечётное значение: идёт запись
+        for i, code in enumerate(self.codes):
+            self._rates[i] = rates.get(code, float("nan"))
+        struct.pack_into("<d4s", self.shm.buf, 16, snapshot.timestamp.timestamp(),
+                         (snapshot.base or "").encode("ascii"))
+        self._header[0] += 1
+
+    @property
+    def version(self):
+        """
+        Номер публикации (0 - таблица ещё не публиковалась).
+        """
+        return self._header[0] // 2
+
+    def get_rate(self, from_currency, to_currency):
+        """
+        Кросс-курс из общей памяти: читаются только две ячейки.
+        :return: Курс (float) или None, если курса нет в таблице.
+        """
+        return self.read_rate(from_currency, to_currency)[0]
+
+    def read_rate(self, from_currency, to_currency):
+        """
+        Кросс-курс и время публикации, прочитанные в одном цикле seqlock:
+        свежесть проверяется по той же публикации, из которой взят курс.
+        :return: (курс или None, время публикации в секундах epoch); время 0.0 - таблица не публиковалась.
+        :raises KeyError: Валюты нет в раскладке.
+        """
+        i, j = self.index[from_currency], self.index[to_currency]
+        while True:
+            seq = self._header[0]
+            if seq & 1:
+                continue
+            rate = self._rates[j] / self._rates[i]
+            published_at = self._published_at[0]
+            if self._header[0] == seq:
+                return (None if rate != rate else rate), published_at  # NaN - курса нет
+
+    def read(self):
+        """
+        Согласованная копия всей таблицы.
+        :return: RateSnapshot или None, если таблица ещё не публиковалась.
+        """
+        while True:
+            seq = self._header[0]
+            if seq & 1:
+                continue
+            if seq == 0:
+                return None
+            rates = {code: value for code, value in zip(self.codes, self._rates.tolist()) if value == value}
+            _, _, timestamp, base = HEADER.unpack_from(self.shm.buf, 0)
+            if self._header[0] == seq:
+                return RateSnapshot(base.rstrip(b"\0").decode("ascii"), rates, datetime.fromtimestamp(timestamp))
+
+    def timestamp(self):
+        """
+        Время последней публикации (секунды epoch; 0.0 - не публиковалась), прочитанное под seqlock.
+        """
+        while True:
+            seq = self._header[0]
+            if seq & 1:
+                continue
+            published_at = self._published_at[0]
+            if self._header[0] == seq:
+                return published_at
+
+    def close(self):
+        """
+        Отключается от блока; публикатор также удаляет его.
+        """
+        self._header.release()
+        self._published_at.release()
+        self._rates.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedRateCache:
+    def __init__(self, table, max_age=timedelta(hours=2)):
+        """
+        Кэш рабочего процесса поверх SharedRateTable: совместим с CurrencyCache по
+        get_rate/get_snapshot, но никогда не обращается к API сам.
+        :table: SharedRateTable, подключённая через attach.
+        :max_age: Максимальный возраст таблицы; более старая считается недоступной.
+        """
+        self.table = table
+        self.max_age = max_age.total_seconds()
+
+    def _fresh(self, published_at):
+        return published_at > 0.0 and time.time() - published_at < self.max_age
+
+    def get_snapshot(self, api=None, deadline=None):
+        snapshot = self.table.read()
+        if snapshot is None or not self._fresh(snapshot.timestamp.timestamp()):
+            return None
+        return snapshot
+
+    def get_rate(self, from_currency, to_currency, api=None, deadline=None):
+        """
+        Курс из общей памяти; deadline принимается для совместимости с CurrencyCache (сети здесь нет).
+        :return: Курс (float) или None, если валюты нет в таблице.
+        :raises RateUnavailable: Таблица не публиковалась или старше max_age.
+        """
+        try:
+            rate, published_at = self.table.read_rate(from_currency, to_currency)
+        except KeyError:
+            if not self._fresh(self.table.timestamp()):
+                raise RateUnavailable(f"Общая таблица курсов {self.table.name} устарела или не опубликована")
+            return None
+        if not self._fresh(published_at):
+            raise RateUnavailable(f"Общая таблица курсов {self.table.name} устарела или не опубликована")
+        return rate
+
+
+class SharedRatePublisher:
+    def __init__(self, table, cache, api, interval=60.0, retry_max=600.0):
+        """
+        Процесс-публикатор: берёт таблицу из своего кэша (единственный, кто ходит в API)
+        и публикует её в общую память, если она изменилась.
+        :table: SharedRateTable, созданная через create.
+        :cache: CurrencyCache публикатора.
+        :api: CurrencyAPI.
+        :interval: Период проверки в секундах.
+        :retry_max: Предельная пауза после сбоев подряд: после каждого сбоя пауза удваивается
+            (от interval), после успешной публикации возвращается к interval.
+        """
+        self.table = table
+        self.cache = cache
+        self.api = api
+        self.interval = interval
+        self.retry_max = retry_max
+        self._published = None
+        self._failures = 0  # сбоев подряд
+
+    def publish_once(self):
+        snapshot = self.cache.get_snapshot(self.api)
+        if snapshot is not None and snapshot is not self._published:
+            self.table.publish(snapshot)
+            self._published = snapshot
+        return snapshot
+
+    def run_forever(self, stop_event=None):
+        """
+        Публикует таблицу каждые interval секунд до установки stop_event.
+        """
+        while stop_event is None or not stop_event.is_set():
+            delay = self.interval
+            try:
+                self.publish_once()
+                self._failures = 0
+            except Exception:
+                # Сбой API: читатели продолжают получать последнюю опубликованную таблицу.
+                delay = min(self.interval * 2 ** self._failures, max(self.retry_max, self.interval))
+                self._failures += 1
+                logger.exception("Публикация таблицы курсов в %s не удалась (сбоев подряд: %d), повтор через %.1f с",
+                                 self.table.name, self._failures, delay)
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
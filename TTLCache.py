@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, maxsize=128, ttl=3600.0, clock=time.monotonic):
+        """
+        Потокобезопасный кэш с ограничением размера (LRU) и временем жизни записей.
+        Время жизни отсчитывается по монотонным часам и не зависит от перевода системного времени.
+        :maxsize: Максимальное число записей; при переполнении вытесняется давно не используемая.
+        :ttl: Время жизни записи в секундах.
+        :clock: Источник времени (по умолчанию time.monotonic).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Возвращает значение по ключу, если оно есть и не истекло.
+        Ключ должен быть хешируемым: строка, кортеж и т.п.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] > self.clock():
+                    self._data.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[0]
+                del self._data[key]
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return default
+
+    def peek(self, key, default=None):
+        """
+        Как get, но не учитывается в stats и не меняет порядок вытеснения:
+        для повторной проверки ключа, промах по которому уже учтён.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is not None and entry[1] > self.clock():
+            return entry[0]
+        return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Сохраняет значение.
+        :ttl: Время жизни этой записи в секундах (по умолчанию - общее для кэша).
+        """
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def purge_expired(self):
+        """
+        Удаляет все истёкшие записи.
+        :return: Количество удалённых записей.
+        """
+        now = self.clock()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[1] > self.clock()
@@ -0,0 +1,99 @@
+"""
+Сроки вызовов и предохранитель против зависшего и сбоящего поставщика курсов.
+Заглушка сначала отдаёт таблицу, затем --outage секунд зависает (или отвечает 500),
+затем снова работает. Клиент всё это время запрашивает таблицу через CurrencyCache
+раз в --interval секунд и классифицирует каждый вызов: свежая таблица, последняя
+известная (предохранитель разомкнут), ошибка поставщика, истёкший срок.
+Для сравнения - один вызов без срока к зависшей заглушке.
+Запуск из корня репозитория: python benchmarks/bench_breaker.py --outage 3 --deadline 0.2
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CircuitBreaker import CircuitBreaker
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from CurrencyErrors import RateError
+from stub_server import StubRateServer
+
+
+def classify(cache, api, deadline, max_age):
+    start = time.perf_counter()
+    try:
+        snapshot = cache.get_snapshot(api, deadline)
+        outcome = "свежая таблица" if datetime.now() - snapshot.timestamp < max_age else "последняя известная"
+    except RateError as e:
+        outcome = type(e).__name__
+    return outcome, time.perf_counter() - start
+
+
+def run(server, args, mode):
+    breaker = CircuitBreaker(failure_threshold=args.threshold, reset_timeout=args.reset_timeout, name=mode)
+    api = CurrencyAPI(server.url, request_timeout=args.request_timeout, breaker=breaker, conditional_get=False)
+    cache = CurrencyCache()
+    max_age = timedelta(seconds=args.cache_ttl)
+    cache.cache_duration = max_age
+    cache.get_snapshot(api)  # последняя известная таблица до сбоя
+
+    outcomes = Counter()
+    latencies = defaultdict(list)
+    before = server.request_count
+    start = time.perf_counter()
+    outage_end = start + args.outage
+    if mode == "hang":
+        server.latency = args.hang
+    else:
+        server.status = 500
+    while time.perf_counter() < outage_end + args.recovery:
+        if time.perf_counter() >= outage_end:
+            server.latency, server.status = 0.0, 200
+        outcome, elapsed = classify(cache, api, args.deadline, max_age)
+        outcomes[outcome] += 1
+        latencies[outcome].append(elapsed)
+        time.sleep(args.interval)
+    server.latency, server.status = 0.0, 200
+    api.close()
+
+    print(f"\n{'зависание' if mode == 'hang' else 'ответы 500'} {args.outage:g} с, затем {args.recovery:g} с работы; "
+          f"запросов к заглушке {server.request_count - before}, предохранитель: {breaker.stats}")
+    for outcome, count in outcomes.most_common():
+        values = sorted(latencies[outcome])
+        print(f"  {outcome:22} {count:5} вызовов, медиана {values[len(values) // 2] * 1e3:8.2f} мс, "
+              f"максимум {values[-1] * 1e3:8.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--outage", type=float, default=3.0, help="Длительность сбоя, секунды")
+    parser.add_argument("--recovery", type=float, default=1.5, help="Сколько наблюдать после восстановления")
+    parser.add_argument("--hang", type=float, default=5.0, help="Задержка ответа зависшей заглушки, секунды")
+    parser.add_argument("--deadline", type=float, default=0.2, help="Срок одного вызова, секунды")
+    parser.add_argument("--request-timeout", type=float, default=0.5, help="Предел одного запроса к API")
+    parser.add_argument("--threshold", type=int, default=3, help="Сбоев подряд до размыкания")
+    parser.add_argument("--reset-timeout", type=float, default=1.0)
+    parser.add_argument("--cache-ttl", type=float, default=0.1, help="Срок актуальности таблицы в кэше")
+    parser.add_argument("--interval", type=float, default=0.01, help="Пауза между вызовами клиента")
+    args = parser.parse_args()
+
+    with StubRateServer() as server:
+        api = CurrencyAPI(server.url, request_timeout=None)
+        api.get_snapshot()  # прогрев: импорт aiohttp и первое соединение
+        server.latency = args.hang
+        start = time.perf_counter()
+        api.get_snapshot()
+        print(f"без срока и предохранителя: вызов к зависшей заглушке длился {time.perf_counter() - start:.2f} с")
+        server.latency = 0.0
+        api.close()
+
+        run(server, args, "hang")
+        run(server, args, "errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Экономия трафика и соединений от пула сессий и условных запросов CurrencyAPI.
+Делает N обновлений таблицы против локальной заглушки с условным GET и без него.
+Запуск из корня репозитория: python benchmarks/bench_conditional_get.py --refreshes 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CurrencyAPI import CurrencyAPI
+from stub_server import StubRateServer
+
+
+def run(refreshes, conditional_get):
+    with StubRateServer() as server:
+        api = CurrencyAPI(server.url, conditional_get=conditional_get)
+        start = time.perf_counter()
+        for _ in range(refreshes):
+            api.get_snapshot()
+        elapsed = time.perf_counter() - start
+        api.close()
+        return elapsed, dict(api.stats), server.connection_count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refreshes", type=int, default=100)
+    args = parser.parse_args()
+
+    for conditional_get in (False, True):
+        elapsed, stats, server_connections = run(args.refreshes, conditional_get)
+        print(f"conditional_get={conditional_get}: {elapsed * 1000 / args.refreshes:.2f} ms/обновление")
+        print(f"  получено байт:           {stats['bytes_received']}")
+        print(f"  ответов 304:             {stats['not_modified']}")
+        print(f"  соединений создано:      {stats['connections_created']} (на сервере: {server_connections})")
+        print(f"  соединений переиспользовано: {stats['connections_reused']}")
+
+
+if __name__ == "__main__":
+    main()
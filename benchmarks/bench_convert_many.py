@@ -0,0 +1,63 @@
+"""
+Сравнение CurrencyConverter.convert в цикле и CurrencyConverter.convert_many.
+Запуск из корня репозитория: python benchmarks/bench_convert_many.py --rows 100000
+Сеть не используется: таблица курсов подставляется фиктивным API.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ConverterLogging import setup_logging
+from CurrencyCache import CurrencyCache
+from CurrencyConverter import CurrencyConverter
+from CurrencyFormatter import CurrencyFormatter
+from RateSnapshot import RateSnapshot
+
+RATES = {"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "JPY": 151.3, "RUB": 92.5}
+
+
+class FixtureAPI:
+    api_url = "fixture://rates"
+
+    async def get_snapshot(self):
+        return RateSnapshot("USD", dict(RATES))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+    # Логи пишутся как в рабочем режиме, но во временный файл.
+    setup_logging(filename=os.path.join(tempfile.mkdtemp(), "bench.log"))
+
+    codes = list(RATES)
+    rnd = random.Random(42)
+    amounts = [rnd.uniform(1, 10000) for _ in range(args.rows)]
+    from_codes = [rnd.choice(codes) for _ in range(args.rows)]
+    to_codes = [rnd.choice(codes) for _ in range(args.rows)]
+
+    converter = CurrencyConverter(CurrencyCache(), CurrencyFormatter(), FixtureAPI())
+    converter.convert("USD", "EUR", 1.0)  # прогрев кэша
+
+    start = time.perf_counter()
+    for f, t, a in zip(from_codes, to_codes, amounts):
+        converter.convert(f, t, a)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.convert_many(from_codes, to_codes, amounts)
+    batch_time = time.perf_counter() - start
+
+    print(f"rows:            {args.rows}")
+    print(f"convert (цикл):  {loop_time:.3f} s, {args.rows / loop_time:,.0f} rows/s")
+    print(f"convert_many:    {batch_time:.3f} s, {args.rows / batch_time:,.0f} rows/s")
+    print(f"ускорение:       x{loop_time / batch_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Сравнение трёх путей конвертации массива сумм:
+float (amount * rate), FixedPointEngine (int64) и Decimal построчно.
+Проверяет, что FixedPointEngine совпадает с Decimal до последней минимальной единицы.
+Запуск из корня репозитория: python benchmarks/bench_fixed_point.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_HALF_EVEN
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from FixedPointEngine import FixedPointEngine
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--decimal-rows", type=int, default=200000, help="Строк для медленного пути Decimal")
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    engine = FixedPointEngine()
+    rate = 0.79  # USD -> GBP
+    scaled_rate = engine.scale_rate(rate, "USD", "GBP")
+    minor = np.array([rnd.randint(1, 10 ** 9) for _ in range(args.rows)], dtype=np.int64)
+
+    float_result, float_time = timed(lambda: np.rint(minor / 100 * rate * 100).astype(np.int64))
+    fixed_result, fixed_time = timed(lambda: engine.convert_minor(minor, scaled_rate))
+
+    sample = minor[:args.decimal_rows].tolist()
+    decimal_rate = Decimal(scaled_rate) / engine.scale
+    decimal_result, decimal_time = timed(
+        lambda: [int((Decimal(a) * decimal_rate).to_integral_value(ROUND_HALF_EVEN)) for a in sample])
+    decimal_time *= args.rows / len(sample)  # пересчёт на полный объём
+
+    mismatches = int(np.count_nonzero(fixed_result[:len(sample)] != np.array(decimal_result, dtype=np.int64)))
+    float_off = int(np.count_nonzero(float_result[:len(sample)] != np.array(decimal_result, dtype=np.int64)))
+
+    print(f"rows: {args.rows}")
+    print(f"float:            {float_time:.3f} s, {args.rows / float_time:,.0f} rows/s, расхождений с Decimal: {float_off}")
+    print(f"FixedPointEngine: {fixed_time:.3f} s, {args.rows / fixed_time:,.0f} rows/s, расхождений с Decimal: {mismatches}")
+    print(f"Decimal (оценка): {decimal_time:.3f} s, {args.rows / decimal_time:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
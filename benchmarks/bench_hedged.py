@@ -0,0 +1,75 @@
+"""
+Хвостовые задержки загрузки таблицы курсов: один поставщик (CurrencyAPI) против пула
+поставщиков с дублирующими запросами (ProviderPool). Каждая заглушка отвечает за --latency,
+но доля --tail-rate ответов задерживается на --tail-latency (у каждой заглушки свой генератор).
+Запуск из корня репозитория: python benchmarks/bench_hedged.py --requests 300 --providers 2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CurrencyAPI import CurrencyAPI
+from ProviderPool import ProviderPool
+from load_test import percentile
+from stub_server import StubRateServer
+
+
+def measure(api, requests):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        snapshot = api.get_snapshot()
+        latencies.append(time.perf_counter() - start)
+        assert snapshot is not None
+    return sorted(latencies)
+
+
+def report(name, latencies, upstream):
+    print(f"{name:26} p50 {percentile(latencies, 50) * 1e3:7.1f} мс   p95 {percentile(latencies, 95) * 1e3:7.1f} мс   "
+          f"p99 {percentile(latencies, 99) * 1e3:7.1f} мс   max {latencies[-1] * 1e3:7.1f} мс   "
+          f"запросов к поставщикам {upstream}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--providers", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=0.3)
+    parser.add_argument("--hedge-percentile", type=float, default=0.9)
+    args = parser.parse_args()
+
+    servers = [StubRateServer(latency=args.latency, tail_rate=args.tail_rate, tail_latency=args.tail_latency,
+                              seed=i).start() for i in range(args.providers)]
+    try:
+        # Без условных запросов: каждый запрос загружает таблицу целиком.
+        single = CurrencyAPI(servers[0].url, conditional_get=False)
+        single.get_snapshot()  # прогрев: импорт aiohttp и первое соединение
+        before = servers[0].request_count
+        report("один поставщик", measure(single, args.requests), servers[0].request_count - before)
+        single.close()
+
+        pool = ProviderPool([server.url for server in servers], hedge_percentile=args.hedge_percentile,
+                            conditional_get=False)
+        for _ in range(pool.async_api.min_samples * args.providers):
+            pool.get_snapshot()  # прогрев: замеры задержек каждого поставщика
+        before = sum(server.request_count for server in servers)
+        latencies = measure(pool, args.requests)
+        report(f"пул из {args.providers}, дубль на p{args.hedge_percentile * 100:.0f}", latencies,
+               sum(server.request_count for server in servers) - before)
+        print(f"статистика пула: {pool.stats}")
+        for stats in pool.provider_stats():
+            print(f"  {stats['api_url']}: запросов {stats['requests']}, побед {stats['wins']}, "
+                  f"отменено {stats['cancelled']}, p50 {stats['p50'] * 1e3:.1f} мс, p95 {stats['p95'] * 1e3:.1f} мс")
+        pool.close()
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+История курсов (HistoricalRateStore): размер файла, время добавления,
+поиска курса на дату (двоичный поиск) и сканирования периода в зависимости от длины истории,
+а также эффект compact (срок хранения и прореживание).
+Запуск из корня репозитория: python benchmarks/bench_history.py --rows 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CurrencyConverter import CurrencyConverter
+from CurrencyFormatter import CurrencyFormatter
+from HistoricalRateStore import HistoricalRateStore
+from RateSnapshot import RateSnapshot
+from stub_server import fixture_rates
+
+
+def fill(store, rates, rows, start, step):
+    rnd = random.Random(0)
+    codes = list(rates)
+    current = dict(rates)
+    begin = time.perf_counter()
+    for i in range(rows):
+        for code in rnd.sample(codes, 10):  # за шаг меняется часть курсов
+            current[code] *= 1 + rnd.uniform(-0.001, 0.001)
+        store.append(RateSnapshot("USD", dict(current, USD=1.0), start + i * step))
+    return time.perf_counter() - begin
+
+
+def lookups_per_second(store, start, step, rows, count=20000):
+    rnd = random.Random(1)
+    moments = [start + rnd.randrange(rows) * step + step / 2 for _ in range(count)]
+    begin = time.perf_counter()
+    for at in moments:
+        store.get_rate("EUR", "JPY", at)
+    return count / (time.perf_counter() - begin)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--currencies", type=int, default=170)
+    parser.add_argument("--step-minutes", type=int, default=60, help="Интервал между таблицами")
+    args = parser.parse_args()
+
+    rates = fixture_rates(args.currencies)
+    step = timedelta(minutes=args.step_minutes)
+    directory = tempfile.mkdtemp()
+    for rows in args.rows:
+        path = os.path.join(directory, f"history_{rows}.bin")
+        store = HistoricalRateStore(path)
+        start = datetime(2020, 1, 1)
+        append_time = fill(store, rates, rows, start, step)
+        store.close()
+        size = os.path.getsize(path)
+        store = HistoricalRateStore(path)
+        lookups = lookups_per_second(store, start, step, rows)
+
+        middle = start + rows // 2 * step
+        begin = time.perf_counter()
+        week = store.scan(middle, middle + timedelta(days=7))
+        scan_time = time.perf_counter() - begin
+
+        converter = CurrencyConverter(None, CurrencyFormatter(), None, history=store)
+        result = converter.convert("USD", "EUR", 100.0, at=middle.date())
+
+        end = start + rows * step
+        removed = store.compact(downsample_after=timedelta(days=30), now=end)
+        print(f"строк {rows:>7}: файл {size / 1024:9.1f} КиБ ({size / rows:.0f} Б/строку), "
+              f"добавление {append_time / rows * 1e6:6.1f} мкс, поиск на дату {lookups:9,.0f}/с, "
+              f"неделя ({len(week)} строк) {scan_time * 1e3:6.2f} мс, convert(at=) {result}; "
+              f"compact -{removed} строк -> {os.path.getsize(path) / 1024:.1f} КиБ")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Загрузка таблицы курсов: размер ответа, распаковка, разбор JSON и выделения памяти.
+Для таблиц из --currencies валют (или --fixture) сравниваются:
+  - размер тела без сжатия, gzip и br (если установлен brotli);
+  - время распаковки и разбора RatePayload.parse_snapshot стандартным json и orjson;
+  - число живых блоков и байт после разбора (tracemalloc) и пик памяти во время разбора;
+  - сквозная загрузка через заглушку: CurrencyAPI без сжатия и с gzip.
+Запуск из корня репозитория: python benchmarks/bench_payload.py --currencies 170 1000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import RatePayload
+from CurrencyAPI import CurrencyAPI
+from stub_server import StubRateServer, fixture_rates, load_fixture
+
+
+def best_of(func, repeat=5, number=200):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def allocations(func):
+    """
+    (живых блоков, живых байт, пик байт) для результата одного вызова func.
+    """
+    tracemalloc.start()
+    result = func()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    del result
+    return sum(s.count for s in stats), sum(s.size for s in stats), peak
+
+
+def bench_decode(name, rates):
+    body = json.dumps({"provider": "stub", "base": "USD", "date": "2026-10-18", "time_last_updated": 0,
+                       "rates": rates}).encode()
+    gzipped = gzip.compress(body, compresslevel=6)
+    print(f"\n{name}: {len(rates)} валют")
+    print(f"  размер: без сжатия {len(body):,} Б, gzip {len(gzipped):,} Б ({len(gzipped) / len(body):.0%})", end="")
+    if RatePayload.brotli:
+        print(f", br {len(RatePayload.brotli.compress(body)):,} Б")
+    else:
+        print(" (brotli не установлен)")
+    unzip = best_of(lambda: RatePayload.decompress(gzipped, "gzip"))
+    print(f"  распаковка gzip: {unzip * 1e6:8.1f} мкс")
+
+    decoders = [("json", json.loads)]
+    if RatePayload.orjson:
+        decoders.append(("orjson", RatePayload.orjson.loads))
+    for decoder, loads in decoders:
+        parse = best_of(lambda: RatePayload.parse_snapshot(body, loads))
+        blocks, size, peak = allocations(lambda: RatePayload.parse_snapshot(body, loads))
+        print(f"  разбор {decoder:7} {parse * 1e6:8.1f} мкс, живых блоков {blocks:5}, живых байт {size:7,}, "
+              f"пик {peak:7,} Б")
+
+
+def bench_fetch(rates, requests):
+    with StubRateServer(rates=rates, compress=True) as server:
+        for compression in (False, True):
+            api = CurrencyAPI(server.url, conditional_get=False, compression=compression)
+            api.get_snapshot()  # прогрев: импорт aiohttp и первое соединение
+            before = dict(api.stats)
+            start = time.perf_counter()
+            for _ in range(requests):
+                api.get_snapshot()
+            elapsed = (time.perf_counter() - start) / requests
+            wire = (api.stats["bytes_received"] - before["bytes_received"]) / requests
+            decoded = (api.stats["bytes_decoded"] - before["bytes_decoded"]) / requests
+            print(f"  {'gzip' if compression else 'без сжатия':11} по сети {wire:8,.0f} Б/запрос, "
+                  f"после распаковки {decoded:8,.0f} Б, {elapsed * 1e3:6.2f} мс/запрос")
+            api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, nargs="+", default=[170, 1000])
+    parser.add_argument("--fixture", help="JSON-файл с таблицей курсов вместо синтетических")
+    parser.add_argument("--requests", type=int, default=200, help="Запросов в сквозном замере")
+    args = parser.parse_args()
+
+    tables = ([(args.fixture, load_fixture(args.fixture))] if args.fixture else
+              [("синтетическая таблица", fixture_rates(count)) for count in args.currencies])
+    for name, rates in tables:
+        bench_decode(name, rates)
+        print("  сквозная загрузка через заглушку:")
+        bench_fetch(rates, args.requests)
+
+
+if __name__ == "__main__":
+    main()
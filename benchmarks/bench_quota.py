@@ -0,0 +1,84 @@
+"""
+Запросы к API под ограничителем QuotaLimiter.
+--tables таблиц (разные URL одной заглушки) загружаются одновременно и обновляются в фоне
+(RefreshPolicy без разброса), а клиенты всё это время конвертируют суммы.
+Без ограничителя обновления уходят пачками в момент истечения мягкого срока;
+с ограничителем они разнесены по окнам, а после исчерпания суточной квоты
+кэш отдаёт последние известные таблицы.
+Запуск из корня репозитория: python benchmarks/bench_quota.py --tables 20 --duration 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from RateLimiter import QuotaLimiter
+from RefreshPolicy import RefreshPolicy
+from stub_server import StubRateServer
+
+
+def run(server, args, limiter):
+    apis = [CurrencyAPI(f"{server.url}?table={i}", limiter=limiter) for i in range(args.tables)]
+    cache = CurrencyCache(refresh_policy=RefreshPolicy(soft_ttl=args.soft_ttl, hard_ttl=args.soft_ttl * 3, jitter=0))
+    windows = Counter()
+    served = failed = 0
+    stop = threading.Event()
+
+    def sample():
+        # Сколько запросов пришло в заглушку за каждые --window секунд.
+        last = server.request_count
+        while not stop.wait(args.window):
+            current = server.request_count
+            windows[current - last] += 1
+            last = current
+
+    for api in apis:
+        cache.get_rate("USD", "EUR", api)  # первая загрузка всех таблиц - одновременно, в пике не учитывается
+    before = server.request_count
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        for api in apis:
+            try:
+                served += cache.get_rate("USD", "EUR", api) is not None
+            except Exception:
+                failed += 1
+        time.sleep(0.001)
+    stop.set()
+    sampler.join()
+    cache.close()
+    for api in apis:
+        api.close()
+    return server.request_count - before + args.tables, max(windows), served, failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--soft-ttl", type=float, default=1.0)
+    parser.add_argument("--window", type=float, default=0.05, help="Окно подсчёта всплеска запросов, секунды")
+    parser.add_argument("--rate", type=float, default=40.0, help="Запросов в секунду для ограничителя")
+    parser.add_argument("--quota", type=int, default=60, help="Квота на прогон (вместо суточной)")
+    args = parser.parse_args()
+
+    with StubRateServer() as server:
+        for name, limiter in [("без ограничителя", None),
+                              (f"ведро {args.rate:g}/с", QuotaLimiter(rate=args.rate, burst=args.tables)),
+                              (f"ведро + квота {args.quota}", QuotaLimiter(rate=args.rate, burst=args.tables,
+                                                                           daily_quota=args.quota))]:
+            upstream, peak, served, failed = run(server, args, limiter)
+            print(f"{name:22} запросов к API {upstream:4}, из них обновлений в одном окне {args.window * 1e3:.0f} мс "
+                  f"не больше {peak:3}, "
+                  f"ответов клиентам {served:,}, ошибок {failed}")
+
+
+if __name__ == "__main__":
+    main()
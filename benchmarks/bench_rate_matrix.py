@@ -0,0 +1,79 @@
+"""
+Матрица кросс-курсов (RateMatrix) против поиска по парам:
+одиночный курс, convert_many по массивам кодов и обновление матрицы
+при изменении части курсов (частичное против полного построения).
+Запуск из корня репозитория: python benchmarks/bench_rate_matrix.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from CurrencyConverter import CurrencyConverter
+from CurrencyFormatter import CurrencyFormatter
+from RateMatrix import RateMatrix
+from RateSnapshot import RateSnapshot
+from stub_server import fixture_rates
+
+
+class SnapshotCache:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def get_snapshot(self, api, deadline=None):
+        return self.snapshot
+
+    def get_rate(self, from_currency, to_currency, api, deadline=None):
+        return self.snapshot.get_rate(from_currency, to_currency)
+
+
+def best(fn, number, repeat=5):
+    return min(timeit.Timer(fn).repeat(repeat, number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--currencies", type=int, default=170)
+    parser.add_argument("--changed", type=int, default=10, help="Сколько курсов меняется между таблицами")
+    args = parser.parse_args()
+
+    rates = fixture_rates(args.currencies)
+    snapshot = RateSnapshot("USD", rates)
+    matrix = RateMatrix(snapshot)
+    codes = list(rates)
+
+    single_dict = best(lambda: snapshot.get_rate("EUR", "JPY"), 200000)
+    single_matrix = best(lambda: matrix.get_rate("EUR", "JPY"), 200000)
+    print(f"один курс: RateSnapshot {single_dict * 1e9:.0f} нс, RateMatrix {single_matrix * 1e9:.0f} нс")
+
+    rnd = np.random.default_rng(0)
+    from_codes = rnd.choice(codes, args.rows)
+    to_codes = rnd.choice(codes, args.rows)
+    amounts = rnd.uniform(1, 1000, args.rows)
+    converter = CurrencyConverter(SnapshotCache(snapshot), CurrencyFormatter(), None)
+    by_pairs = best(lambda: converter._convert_many_numpy(from_codes, to_codes, amounts, converter._rate), 1, 3)
+    by_matrix = best(lambda: converter.convert_many(from_codes, to_codes, amounts), 1, 3)
+    expected, _ = converter._convert_many_numpy(from_codes, to_codes, amounts, converter._rate)
+    assert np.allclose(expected, converter.convert_many(from_codes, to_codes, amounts), rtol=1e-12)
+    print(f"convert_many {args.rows:,} строк, случайные пары: по парам {by_pairs * 1e3:.1f} мс, "
+          f"матрица {by_matrix * 1e3:.1f} мс (x{by_pairs / by_matrix:.1f})")
+
+    changed = dict(rates)
+    for code in random.Random(0).sample(codes, args.changed):
+        changed[code] *= 1.001
+    snapshots = [RateSnapshot("USD", changed), snapshot]
+    turn = iter(range(10 ** 9))
+    partial = best(lambda: matrix.update(snapshots[next(turn) % 2]), 50)
+    full = best(lambda: RateMatrix(snapshots[next(turn) % 2]), 50)
+    print(f"обновление {args.changed} из {args.currencies} курсов: частичное {partial * 1e6:.0f} мкс, "
+          f"полное построение {full * 1e6:.0f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Общая таблица курсов для нескольких рабочих процессов.
+Один публикатор ходит в API и пишет таблицу в shared memory, рабочие процессы
+только читают её. Сравнивается число запросов к API и память при росте числа процессов
+с режимом, где у каждого процесса свой CurrencyCache.
+Запуск из корня репозитория: python benchmarks/bench_shared_rates.py --workers 1 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_server import StubRateServer, fixture_rates
+
+
+def shared_worker(name, conversions, results):
+    from CurrencyConverter import CurrencyConverter
+    from CurrencyFormatter import CurrencyFormatter
+    from SharedRateTable import SharedRateCache, SharedRateTable
+
+    table = SharedRateTable.attach(name)
+    converter = CurrencyConverter(SharedRateCache(table), CurrencyFormatter(), None)
+    start = time.perf_counter()
+    for _ in range(conversions):
+        converter.convert("USD", "EUR", 100.0)
+    results.put(time.perf_counter() - start)
+    table.close()
+
+
+def private_worker(url, conversions, results):
+    from CurrencyAPI import CurrencyAPI
+    from CurrencyCache import CurrencyCache
+    from CurrencyConverter import CurrencyConverter
+    from CurrencyFormatter import CurrencyFormatter
+
+    api = CurrencyAPI(url)
+    converter = CurrencyConverter(CurrencyCache(), CurrencyFormatter(), api)
+    start = time.perf_counter()
+    for _ in range(conversions):
+        converter.convert("USD", "EUR", 100.0)
+    results.put(time.perf_counter() - start)
+    api.close()
+
+
+def run(target, arg, workers, conversions):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=target, args=(arg, conversions, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    elapsed = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return max(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--conversions", type=int, default=20000)
+    parser.add_argument("--currencies", type=int, default=170)
+    args = parser.parse_args()
+
+    from CurrencyAPI import CurrencyAPI
+    from CurrencyCache import CurrencyCache
+    from SharedRateTable import SharedRatePublisher, SharedRateTable
+
+    rates = fixture_rates(args.currencies)
+    for workers in args.workers:
+        with StubRateServer(rates=rates) as server:
+            table = SharedRateTable.create(sorted(rates))
+            api = CurrencyAPI(server.url)
+            publisher = SharedRatePublisher(table, CurrencyCache(), api, interval=1.0)
+            stop = threading.Event()
+            publisher.publish_once()
+            thread = threading.Thread(target=publisher.run_forever, args=(stop,), daemon=True)
+            thread.start()
+            shared_time = run(shared_worker, table.name, workers, args.conversions)
+            stop.set()
+            thread.join()
+            shared_requests, shared_size = server.request_count, table.shm.size
+            table.close()
+            api.close()
+
+        with StubRateServer(rates=rates) as server:
+            private_time = run(private_worker, server.url, workers, args.conversions)
+            private_requests = server.request_count
+
+        print(f"процессов {workers:3}: общая память - запросов к API {shared_requests}, "
+              f"блок {shared_size} байт на все процессы, {shared_time:.2f} s; "
+              f"свои кэши - запросов к API {private_requests}, {private_time:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Время от запуска процесса до первого результата конвертации:
+холодный старт (таблица загружается из API) против тёплого (из SQLiteRateStore).
+Заглушка API отвечает с задержкой --latency, чтобы имитировать реальную сеть.
+Запуск из корня репозитория: python benchmarks/bench_warm_start.py --latency 0.3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import StubRateServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_RESULT = """
+import sys
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from RateStore import SQLiteRateStore
+cache = CurrencyCache(store=SQLiteRateStore(sys.argv[2]))
+print(cache.get_rate("USD", "EUR", CurrencyAPI(sys.argv[1])))
+"""
+
+
+def first_result_time(url, store_path):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", FIRST_RESULT, url, store_path], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with StubRateServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        cold, warm = [], []
+        for i in range(args.runs):
+            store_path = os.path.join(tmp, f"cold{i}.sqlite3")
+            cold.append(first_result_time(server.url, store_path))
+        store_path = os.path.join(tmp, "warm.sqlite3")
+        first_result_time(server.url, store_path)
+        for _ in range(args.runs):
+            warm.append(first_result_time(server.url, store_path))
+
+        print(f"холодный старт: {min(cold) * 1000:.0f} ms (лучший из {args.runs})")
+        print(f"тёплый старт:   {min(warm) * 1000:.0f} ms (лучший из {args.runs})")
+        print(f"запросов к API: {server.request_count}")
+
+
+if __name__ == "__main__":
+    main()
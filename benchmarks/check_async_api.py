@@ -0,0 +1,130 @@
+"""
+Проверка AsyncCurrencyAPI и AsyncCurrencyCache против локальной заглушки API:
+  - одновременные промахи кэша объединяются в один запрос (single-flight);
+  - повторный запрос с If-None-Match получает 304 и продлевает прежнюю таблицу;
+  - ответ 5xx превращается в ProviderError со статусом;
+  - зависший поставщик прерывается по request_timeout и по сроку вызывающего (DeadlineExceeded),
+    а общая загрузка после ухода вызывающего всё равно пополняет кэш;
+  - сжатый ответ распаковывается (по сети меньше байт, чем после распаковки).
+Запуск из корня репозитория: python benchmarks/check_async_api.py   # код возврата 1 при ошибке
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AsyncCurrencyAPI import AsyncCurrencyAPI
+from AsyncCurrencyCache import AsyncCurrencyCache
+from CurrencyErrors import DeadlineExceeded, ProviderError
+from stub_server import StubRateServer
+
+
+async def check_single_flight(callers):
+    with StubRateServer(latency=0.2) as server:
+        api = AsyncCurrencyAPI(server.url)
+        cache = AsyncCurrencyCache()
+        try:
+            snapshots = await asyncio.gather(*(cache.get_snapshot(api) for _ in range(callers)))
+        finally:
+            await api.close()
+        distinct = len({id(snapshot) for snapshot in snapshots})
+        return (server.request_count == 1 and distinct == 1,
+                f"{callers} вызывающих, запросов {server.request_count}, разных таблиц {distinct}")
+
+
+async def check_not_modified():
+    with StubRateServer() as server:
+        api = AsyncCurrencyAPI(server.url, conditional_get=True)
+        try:
+            first = await api.get_snapshot()
+            second = await api.get_snapshot()
+        finally:
+            await api.close()
+        ok = (server.not_modified_count == 1 and api.stats["not_modified"] == 1
+              and second.rates == first.rates and second.timestamp >= first.timestamp)
+        return ok, f"ответов 304: {server.not_modified_count}, таблица сохранена: {second.rates == first.rates}"
+
+
+async def check_provider_error():
+    with StubRateServer(status=503) as server:
+        api = AsyncCurrencyAPI(server.url)
+        try:
+            await api.get_snapshot()
+        except ProviderError as e:
+            return e.status == 503, f"ProviderError, статус {e.status}"
+        finally:
+            await api.close()
+        return False, "ошибка 503 не превратилась в ProviderError"
+
+
+async def check_timeouts():
+    with StubRateServer(latency=0.5) as server:
+        api = AsyncCurrencyAPI(server.url, request_timeout=0.1)
+        start = time.perf_counter()
+        try:
+            await api.get_snapshot()
+            return False, "request_timeout не сработал"
+        except DeadlineExceeded:
+            request_elapsed = time.perf_counter() - start
+        finally:
+            await api.close()
+
+        api = AsyncCurrencyAPI(server.url, request_timeout=2.0)
+        cache = AsyncCurrencyCache()
+        start = time.perf_counter()
+        try:
+            await cache.get_snapshot(api, deadline=0.1)
+            return False, "срок вызывающего не сработал"
+        except DeadlineExceeded:
+            deadline_elapsed = time.perf_counter() - start
+        try:
+            await asyncio.sleep(0.6)  # общая загрузка продолжается без вызывающего
+            filled = cache.lookup(api) is not None
+        finally:
+            await api.close()
+        ok = request_elapsed < 0.3 and deadline_elapsed < 0.3 and filled
+        return ok, (f"request_timeout через {request_elapsed * 1e3:.0f} мс, срок вызова через "
+                    f"{deadline_elapsed * 1e3:.0f} мс, кэш пополнен фоновой загрузкой: {filled}")
+
+
+async def check_compression():
+    with StubRateServer(compress=True) as server:
+        api = AsyncCurrencyAPI(server.url, conditional_get=False, compression=True)
+        try:
+            snapshot = await api.get_snapshot()
+        finally:
+            await api.close()
+        wire, decoded = api.stats["bytes_received"], api.stats["bytes_decoded"]
+        return bool(snapshot.rates) and wire < decoded, f"по сети {wire} Б, после распаковки {decoded} Б"
+
+
+async def run_checks(args):
+    checks = [
+        ("single-flight", check_single_flight(args.callers)),
+        ("304 Not Modified", check_not_modified()),
+        ("ProviderError на 5xx", check_provider_error()),
+        ("таймауты и сроки", check_timeouts()),
+        ("сжатый ответ", check_compression()),
+    ]
+    failed = 0
+    for name, check in checks:
+        ok, details = await check
+        failed += not ok
+        print(f"{'OK' if ok else 'ОШИБКА':7} {name:22} {details}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--callers", type=int, default=200, help="Одновременных вызывающих в проверке single-flight")
+    args = parser.parse_args()
+    failed = asyncio.run(run_checks(args))
+    print("Все проверки пройдены" if not failed else f"Провалено проверок: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
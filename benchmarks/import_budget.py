@@ -0,0 +1,95 @@
+"""
+Проверка бюджета времени импорта для запуска без интерфейса.
+Каждая цель импортируется в отдельном процессе с python -X importtime;
+проверка проваливается, если цель тянет запрещённые тяжёлые модули
+(PyQt6, requests, NumPy, aiohttp) или импортируется дольше бюджета.
+
+    python benchmarks/import_budget.py                 # код возврата 1 при нарушении
+    python benchmarks/import_budget.py --budget-ms 80 --verbose
+
+Бюджеты по умолчанию (BUDGETS_MS) заданы по замеру с запасом: медиана main и converter
+на эталонной машине 67-95 ms между запусками (asyncio с ssl - около половины), bulk - 21-33 ms.
+Бюджет - худшая медиана плюс ~35-50%, чтобы проверка ловила новый тяжёлый импорт, а не шум.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые не должны загружаться при запуске без интерфейса.
+FORBIDDEN = ("PyQt6", "requests", "numpy", "aiohttp")
+
+TARGETS = {
+    "main": "import main",
+    "converter": "import CurrencyAPI, CurrencyCache, CurrencyConverter, CurrencyFormatter, RateStore",
+    "bulk": "import BulkConverter",
+}
+
+# Бюджет импорта каждой цели, ms (см. замер в описании модуля).
+BUDGETS_MS = {
+    "main": 130.0,
+    "converter": 130.0,
+    "bulk": 50.0,
+}
+
+
+def import_profile(statement, exclude=()):
+    """
+    Импортирует statement в чистом процессе.
+    :exclude: Модули, загружаемые самим интерпретатором при старте (не входят в сумму).
+    :return: {модуль: собственное время в микросекундах}, суммарное время импорта в микросекундах.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # строка заголовка
+        if name.strip() in exclude:
+            continue
+        modules[name.strip()] = int(self_us)
+        if not name.startswith("  "):  # модуль верхнего уровня: cumulative включает вложенные
+            total += int(cumulative_us)
+    return modules, total
+
+
+def check(name, statement, budget_ms, runs, verbose, startup):
+    totals = []
+    for _ in range(runs):
+        modules, total = import_profile(statement, startup)
+        totals.append(total)
+    forbidden = sorted({m.split(".")[0] for m in modules} & set(FORBIDDEN))
+    median_ms = statistics.median(totals) / 1000
+    ok = not forbidden and median_ms <= budget_ms
+    print(f"{name:10} {median_ms:7.1f} ms (бюджет {budget_ms:.0f} ms)  {'OK' if ok else 'НАРУШЕНИЕ'}")
+    if forbidden:
+        print(f"           запрещённые модули: {', '.join(forbidden)}")
+    if verbose:
+        for module, self_us in sorted(modules.items(), key=lambda item: -item[1])[:10]:
+            print(f"           {self_us / 1000:7.2f} ms  {module}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float,
+                        help="Допустимое время импорта любой цели (по умолчанию - свой бюджет из BUDGETS_MS)")
+    parser.add_argument("--runs", type=int, default=3, help="Прогонов на цель (берётся медиана)")
+    parser.add_argument("--verbose", action="store_true", help="Показать самые медленные модули")
+    args = parser.parse_args()
+
+    startup, _ = import_profile("pass")
+    results = [check(name, statement, args.budget_ms or BUDGETS_MS[name], args.runs, args.verbose, startup)
+               for name, statement in TARGETS.items()]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
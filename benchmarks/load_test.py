@@ -0,0 +1,178 @@
+"""
+Нагрузочный тест конвертера: N одновременных клиентов, смесь пар валют,
+истечения TTL во время прогона, локальная заглушка API.
+
+    python benchmarks/load_test.py --concurrency 32 --duration 10 --ttl 2 --latency 0.05
+    python benchmarks/load_test.py --mix "USD:EUR=5,EUR:GBP=2,USD:JPY=1"
+    python benchmarks/load_test.py --client http --concurrency 64   # через ConverterService
+
+Печатает пропускную способность, задержки p50/p95/p99/max и число запросов к API.
+"""
+import argparse
+import asyncio
+import http.client
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import DEFAULT_RATES, StubRateServer
+
+
+def parse_mix(text):
+    """
+    "USD:EUR=5,EUR:GBP=2" -> [(("USD", "EUR"), 5.0), (("EUR", "GBP"), 2.0)]
+    Без параметра - все пары DEFAULT_RATES с равными весами.
+    """
+    if not text:
+        codes = list(DEFAULT_RATES)
+        return [((f, t), 1.0) for f in codes for t in codes if f != t]
+    mix = []
+    for item in text.split(","):
+        pair, _, weight = item.partition("=")
+        from_currency, to_currency = pair.strip().upper().split(":")
+        mix.append(((from_currency, to_currency), float(weight or 1)))
+    return mix
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def make_inproc_client(api_url, ttl):
+    """
+    Клиент, вызывающий CurrencyConverter в этом же процессе.
+    :return: (функция convert(from, to, amount), функция закрытия)
+    """
+    from CurrencyAPI import CurrencyAPI
+    from CurrencyCache import CurrencyCache
+    from CurrencyConverter import CurrencyConverter
+    from CurrencyFormatter import CurrencyFormatter
+
+    api = CurrencyAPI(api_url)
+    cache = CurrencyCache()
+    cache.cache_duration = timedelta(seconds=ttl)
+    converter = CurrencyConverter(cache, CurrencyFormatter(), api)
+    return converter.convert, api.close
+
+
+def make_http_client(api_url, ttl):
+    """
+    Клиент, обращающийся к ConverterService по HTTP с keep-alive.
+    Сервис запускается в этом же процессе в отдельном потоке со своим циклом событий.
+    :return: (функция convert(from, to, amount), функция закрытия)
+    """
+    from ConverterService import ConverterService
+
+    service = ConverterService(api_url)
+    service.cache.cache_duration = timedelta(seconds=ttl)
+    loop = asyncio.new_event_loop()
+    port = loop.run_until_complete(service.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    local = threading.local()
+
+    def convert(from_currency, to_currency, amount):
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", f"/convert?from={from_currency}&to={to_currency}&amount={amount}")
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+
+    def close():
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return convert, close
+
+
+CLIENTS = {"inproc": make_inproc_client, "http": make_http_client}
+
+
+def run_load(convert, mix, concurrency, duration, seed=0):
+    pairs = [pair for pair, _ in mix]
+    weights = [weight for _, weight in mix]
+    deadline = time.perf_counter() + duration
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def client(index):
+        rnd = random.Random(seed + index)
+        local = latencies[index]
+        start_barrier.wait()
+        while time.perf_counter() < deadline:
+            from_currency, to_currency = rnd.choices(pairs, weights)[0]
+            start = time.perf_counter()
+            try:
+                convert(from_currency, to_currency, rnd.uniform(1, 1000))
+            except Exception:
+                errors[index] += 1
+            local.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = sorted(value for values in latencies for value in values)
+    return {
+        "requests": len(merged),
+        "errors": sum(errors),
+        "elapsed": elapsed,
+        "throughput": len(merged) / elapsed if elapsed else 0.0,
+        "p50": percentile(merged, 50),
+        "p95": percentile(merged, 95),
+        "p99": percentile(merged, 99),
+        "max": merged[-1] if merged else 0.0,
+    }
+
+
+def print_report(report, upstream_requests):
+    print(f"запросов:          {report['requests']} (ошибок {report['errors']}) за {report['elapsed']:.1f} s")
+    print(f"пропускная способность: {report['throughput']:,.0f} req/s")
+    for key in ("p50", "p95", "p99", "max"):
+        print(f"{key:4} задержка:      {report[key] * 1000:.3f} ms")
+    print(f"запросов к API:    {upstream_requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--client", choices=sorted(CLIENTS), default="inproc")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--mix", help='Смесь пар, например "USD:EUR=5,EUR:GBP=2"')
+    parser.add_argument("--ttl", type=float, default=1.0, help="TTL кэша: истечения происходят во время прогона")
+    parser.add_argument("--latency", type=float, default=0.05, help="Задержка заглушки API")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    from ConverterLogging import setup_logging
+    setup_logging(filename=os.path.join(tempfile.mkdtemp(), "load.log"))
+
+    with StubRateServer(latency=args.latency, error_rate=args.error_rate, seed=0) as server:
+        convert, close = CLIENTS[args.client](server.url, args.ttl)
+        try:
+            report = run_load(convert, parse_mix(args.mix), args.concurrency, args.duration)
+        finally:
+            close()
+        print_report(report, server.request_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Набор бенчмарков конвертера против локальной заглушки API.
+
+    python benchmarks/run_benchmarks.py                   # прогон и сравнение с baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline   # сохранить результат как новый baseline
+    python benchmarks/run_benchmarks.py --latency 0.05 --error-rate 0.1
+
+Результаты пишутся в JSON (--output); случаи, ставшие медленнее baseline
+больше чем на --threshold, печатаются как регрессии.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ConverterLogging import setup_logging
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from CurrencyConverter import CurrencyConverter
+from CurrencyErrors import RateUnavailable
+from CurrencyFormatter import CurrencyFormatter, FancyCurrencyFormatter
+from stub_server import StubRateServer, fixture_rates
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Запуск main.py до разбора аргументов и выхода: интерпретатор и импорт main без сети и интерфейса.
+STARTUP_COMMAND = ["main.py", "--help"]
+
+
+def measure(fn, number, repeat):
+    """
+    Время одной операции по repeat прогонам из number вызовов.
+    """
+    times = [t / number for t in timeit.Timer(fn).repeat(repeat, number)]
+    median = statistics.median(times)
+    return {"ns_per_op": median * 1e9, "min_ns_per_op": min(times) * 1e9, "ops_per_s": 1 / median,
+            "number": number, "repeat": repeat}
+
+
+def measure_startup(repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + STARTUP_COMMAND, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {"ns_per_op": statistics.median(times) * 1e9, "min_ns_per_op": min(times) * 1e9,
+            "ops_per_s": 1 / statistics.median(times), "number": 1, "repeat": repeat}
+
+
+def run_cases(server, args):
+    api = CurrencyAPI(server.url)
+    cache = CurrencyCache()
+    converter = CurrencyConverter(cache, CurrencyFormatter(), api)
+    converter.convert("USD", "EUR", 100.0)
+
+    def convert_cold():
+        cache.cache.clear()
+        try:
+            converter.convert("USD", "EUR", 100.0)
+        except RateUnavailable:
+            pass  # инъекция ошибок: API вернул 503 (ProviderError)
+
+    n = args.number
+    amounts = [i * 1.37 for i in range(10000)]
+    results = {
+        "convert_hot": measure(lambda: converter.convert("USD", "EUR", 100.0), n, args.repeat),
+        "convert_cold": measure(convert_cold, max(n // 100, 10), args.repeat),
+        "cache_get_rate_hot": measure(lambda: cache.get_rate("USD", "EUR", api), n, args.repeat),
+        "format_currency_formatter": measure(lambda: CurrencyFormatter.format(1234.5678, "EUR", 2), n, args.repeat),
+        "format_fancy_formatter": measure(lambda: FancyCurrencyFormatter.format(1234.5678, "EUR", 2), n, args.repeat),
+        "format_many_10k": measure(lambda: CurrencyFormatter.format_many(amounts, "EUR", 2), max(n // 1000, 5),
+                                   args.repeat),
+        "startup_main": measure_startup(args.repeat),
+    }
+    api.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:28} {result['ns_per_op']:>14,.0f} ns/op   (нет в baseline)")
+            continue
+        ratio = result["ns_per_op"] / base["ns_per_op"]
+        mark = "РЕГРЕССИЯ" if ratio > 1 + threshold else ""
+        print(f"{name:28} {result['ns_per_op']:>14,.0f} ns/op   x{ratio:.2f} к baseline {mark}")
+        if mark:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="Вызовов в одном прогоне")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка заглушки API, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503 от заглушки")
+    parser.add_argument("--currencies", type=int, default=170, help="Размер таблицы курсов заглушки")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимое замедление (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    setup_logging(filename=os.path.join(tempfile.mkdtemp(), "bench.log"))
+    with StubRateServer(rates=fixture_rates(args.currencies), latency=args.latency,
+                        error_rate=args.error_rate, seed=0) as server:
+        results = run_cases(server, args)
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "latency": args.latency,
+                 "error_rate": args.error_rate, "currencies": args.currencies},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"baseline сохранён: {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Стресс-проверка объединения запросов в CurrencyCache.
+Сотни потоков одновременно запрашивают курс у медленной заглушки API
+сразу после истечения кэша; на каждое истечение должен уйти ровно один запрос.
+Запуск из корня репозитория: python benchmarks/stress_single_flight.py --threads 500
+"""
+import argparse
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CurrencyAPI import CurrencyAPI
+from CurrencyCache import CurrencyCache
+from stub_server import StubRateServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=300)
+    parser.add_argument("--expiries", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with StubRateServer(latency=args.latency) as server:
+        api = CurrencyAPI(server.url)
+        cache = CurrencyCache()
+        failures = []
+
+        for expiry in range(1, args.expiries + 1):
+            cache.cache.clear()  # имитация истечения TTL
+            barrier = threading.Barrier(args.threads)
+
+            def worker():
+                barrier.wait()
+                try:
+                    if cache.get_rate("USD", "EUR", api) is None:
+                        failures.append("None")
+                except Exception as e:
+                    failures.append(repr(e))
+
+            threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print(f"истечение {expiry}: потоков {args.threads}, запросов к API всего {server.request_count}")
+
+        api.close()
+
+    ok = server.request_count == args.expiries and not failures
+    print("OK: один запрос на истечение" if ok else f"ОШИБКА: запросов {server.request_count}, сбоев {len(failures)}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Локальный HTTP-сервер, имитирующий api.exchangerate-api.com.
+Используется бенчмарками и ручной проверкой CurrencyAPI без выхода в сеть.
+
+    with StubRateServer(latency=0.05) as server:
+        api = CurrencyAPI(server.url)
+
+Запуск отдельно: python benchmarks/stub_server.py --port 8000 --latency 0.05
+"""
+import argparse
+import email.utils
+import gzip
+import hashlib
+import json
+import random
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RATES = {"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "JPY": 151.3, "RUB": 92.5}
+
+
+def fixture_rates(count=170, seed=0):
+    """
+    Детерминированная таблица из count валют: пять реальных и синтетические коды.
+    Подходит для бенчмарков разбора больших ответов.
+    """
+    rnd = random.Random(seed)
+    rates = dict(DEFAULT_RATES)
+    while len(rates) < count:
+        code = "".join(rnd.choice(string.ascii_uppercase) for _ in range(3))
+        rates.setdefault(code, round(rnd.uniform(0.01, 20000.0), 6))
+    return rates
+
+
+def load_fixture(path):
+    """
+    Загружает таблицу курсов из JSON-файла в формате API ({"base": ..., "rates": {...}}).
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["rates"]
+
+
+class StubRateServer:
+    def __init__(self, rates=None, base="USD", latency=0.0, status=200, port=0, error_rate=0.0, seed=None,
+                 tail_rate=0.0, tail_latency=0.0, compress=False):
+        """
+        :rates: Таблица курсов относительно base (по умолчанию DEFAULT_RATES).
+        :base: Базовая валюта таблицы.
+        :latency: Задержка перед ответом в секундах.
+        :status: HTTP-статус ответа.
+        :port: Порт (0 - выбрать свободный).
+        :error_rate: Доля запросов, на которые сервер отвечает 503.
+        :seed: Зерно генератора для воспроизводимой инъекции ошибок и задержек.
+        :tail_rate: Доля запросов, на которые сервер отвечает с задержкой tail_latency вместо latency.
+        :tail_latency: Задержка «хвостовых» ответов в секундах.
+        :compress: Сжимать таблицу gzip, если клиент прислал Accept-Encoding с gzip.
+        """
+        self.rates = dict(rates or DEFAULT_RATES)
+        self.base = base
+        self.latency = latency
+        self.status = status
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.compress = compress
+        self._compressed = (None, None)  # (ETag, сжатая таблица): сжатие - один раз на версию таблицы
+        self._random = random.Random(seed)
+        self.request_count = 0
+        self.error_count = 0
+        self.not_modified_count = 0
+        self.connection_count = 0
+        self.bytes_sent = 0
+        self.last_modified = email.utils.formatdate(usegmt=True)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v4/latest/{self.base}"
+
+    def payload(self):
+        return json.dumps({"base": self.base, "date": time.strftime("%Y-%m-%d"), "rates": self.rates}).encode()
+
+    def etag(self):
+        return '"' + hashlib.sha1(json.dumps(self.rates, sort_keys=True).encode()).hexdigest() + '"'
+
+    def compressed_payload(self, etag):
+        cached_etag, body = self._compressed
+        if cached_etag != etag:
+            body = gzip.compress(self.payload(), compresslevel=6)
+            self._compressed = (etag, body)
+        return body
+
+    def set_rates(self, rates):
+        """
+        Подменяет таблицу курсов (меняет ETag и Last-Modified).
+        """
+        self.rates = dict(rates)
+        self.last_modified = email.utils.formatdate(usegmt=True)
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                # Один экземпляр обработчика обслуживает одно TCP-соединение (keep-alive).
+                super().setup()
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    tail = stub.tail_rate and stub._random.random() < stub.tail_rate
+                latency = stub.tail_latency if tail else stub.latency
+                if latency:
+                    time.sleep(latency)
+
+                status = stub.status
+                with stub._lock:
+                    if stub.error_rate and stub._random.random() < stub.error_rate:
+                        status = 503
+                    if status != 200:
+                        stub.error_count += 1
+
+                etag = stub.etag()
+                if status == 200 and (self.headers.get("If-None-Match") == etag or
+                                           self.headers.get("If-Modified-Since") == stub.last_modified):
+                    with stub._lock:
+                        stub.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                gzipped = (status == 200 and stub.compress
+                           and "gzip" in self.headers.get("Accept-Encoding", ""))
+                if gzipped:
+                    body = stub.compressed_payload(etag)
+                else:
+                    body = stub.payload() if status == 200 else b"{}"
+                with stub._lock:
+                    stub.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                    self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", stub.last_modified)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # клиент отменил запрос (например, проигравший дублирующий запрос)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная заглушка API курсов валют")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--status", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Доля ответов с задержкой --tail-latency")
+    parser.add_argument("--tail-latency", type=float, default=0.0)
+    parser.add_argument("--currencies", type=int, default=0, help="Размер синтетической таблицы (0 - пять валют)")
+    parser.add_argument("--compress", action="store_true", help="Сжимать ответы gzip по Accept-Encoding")
+    parser.add_argument("--fixture", help="JSON-файл с таблицей курсов")
+    args = parser.parse_args()
+
+    rates = load_fixture(args.fixture) if args.fixture else fixture_rates(args.currencies) if args.currencies else None
+    server = StubRateServer(rates=rates, latency=args.latency, status=args.status, port=args.port,
+                            error_rate=args.error_rate, tail_rate=args.tail_rate, tail_latency=args.tail_latency,
+                            compress=args.compress)
+    print(f"Заглушка API: {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,31 @@
+import argparse
 import sys
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QMessageBox
-)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
-import requests
-from datetime import datetime, timedelta
-import logging
+from ConverterLogging import setup_logging
 from CurrencyAPI import CurrencyAPI
 from CurrencyCache import CurrencyCache
 from CurrencyFormatter import FancyCurrencyFormatter
 from CurrencyConverter import CurrencyConverter
-from CurrencyValidator import CurrencyValidator
-from CurrencyConverterApp import CurrencyConverterApp
+from CurrencyErrors import RateError
+from CurrencyValidator import SUPPORTED_CURRENCIES, CurrencyValidator
+from RateStore import SQLiteRateStore
+
+# PyQt6 импортируется только в run_gui: консольный режим и разовая конвертация запускаются без Qt.
+API_URL = "https://api.exchangerate-api.com/v4/latest/USD"
+TIMEOUT = 10.0  # срок получения курсов в консольных режимах, секунды
+
+
 class Main:
-    def __init__(self):
+    def __init__(self, api_url=API_URL):
         """
         Инициализация главного класса.
+        :api_url: URL таблицы курсов (--api-url).
         """
-        self.api_url = "https://api.exchangerate-api.com/v4/latest/USD"
+        self.api_url = api_url
         self.api = CurrencyAPI(self.api_url)  # Создаем объект CurrencyAPI
-        self.cache = CurrencyCache()
+        self.cache = CurrencyCache(store=SQLiteRateStore())
         self.formatter = FancyCurrencyFormatter()
         self.converter = CurrencyConverter(self.cache, self.formatter, self.api)  # Передаем api
-        self.validator = CurrencyValidator(valid_currencies={"USD": "доллар","EUR": "евро","GBP": "фунт стерлингов","JPY": "иена","RUB": "рубль"})
+        self.validator = CurrencyValidator(valid_currencies=SUPPORTED_CURRENCIES)
 
     def run(self):
         """
@@ -59,11 +61,74 @@ class Main:
             print("Неверный выбор. Используется 2 знака после запятой по умолчанию.")
             decimal_places = 2
 
-        self.converter.convert(from_currency, to_currency, amount, decimal_places)
+        try:
+            print(self.converter.convert(from_currency, to_currency, amount, decimal_places, deadline=TIMEOUT))
+        except (RateError, ValueError) as e:
+            print(f"Ошибка: {e}")
+
+    def close(self):
+        """
+        Закрывает пул соединений aiohttp и фоновые обновления кэша.
+        """
+        self.cache.close()
+        self.api.close()
+
+
+def run_gui():
+    """
+    Запускает графический интерфейс (единственный путь, которому нужен PyQt6).
+    """
+    from PyQt6.QtWidgets import QApplication
+    from CurrencyConverterApp import CurrencyConverterApp
+
+    app = QApplication(sys.argv)
+    window = CurrencyConverterApp()
+    window.show()
+    return app.exec()
+
+
+def convert_once(args):
+    """
+    Разовая конвертация без интерфейса: печатает результат и завершается.
+    """
+    api = CurrencyAPI(args.api_url)
+    converter = CurrencyConverter(CurrencyCache(store=SQLiteRateStore()), FancyCurrencyFormatter(), api)
+    try:
+        print(converter.convert(args.from_currency.upper(), args.to_currency.upper(), args.amount,
+                                args.decimal_places, deadline=args.timeout))
+    except (RateError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    finally:
+        api.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Конвертер валют. Без аргументов запускает графический интерфейс.")
+    parser.add_argument("from_currency", nargs="?", help="Исходная валюта (разовая конвертация без интерфейса)")
+    parser.add_argument("to_currency", nargs="?", help="Целевая валюта")
+    parser.add_argument("amount", nargs="?", type=float, help="Сумма")
+    parser.add_argument("-d", "--decimal-places", type=int, default=2)
+    parser.add_argument("--console", action="store_true", help="Диалог в консоли вместо окна")
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Срок получения курсов, секунды")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if args.amount is not None:
+        return convert_once(args)
+    if args.from_currency is not None:
+        parser.error("нужны исходная валюта, целевая валюта и сумма")
+    if args.console:
+        app = Main(args.api_url)
+        try:
+            app.run()
+        finally:
+            app.close()
+        return 0
+    return run_gui()
+
 
-app = QApplication(sys.argv)
-window = CurrencyConverterApp()
-window.show()
-sys.exit(app.exec())
-#app = Main()
-#app.run()
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())